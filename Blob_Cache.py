@@ -0,0 +1,131 @@
+"""Persistent content-addressed cache for file blobs keyed by Git SHA."""
+
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(".gitsleuth_cache", "blobs")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SHA_RE = re.compile(r"^[0-9a-f]{40}(?:[0-9a-f]{24})?$")
+
+
+class BlobCache:
+    """Size-bounded LRU cache storing zlib-compressed blobs on disk.
+
+    Blobs are stored under ``<directory>/<sha[:2]>/<sha[2:]>.z``. The file
+    modification time records when a blob was last used so the LRU order
+    survives restarts.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # sha -> compressed size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._load_index()
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.directory, sha[:2], sha[2:] + ".z")
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from the blobs already on disk."""
+        if not os.path.isdir(self.directory):
+            return
+        found = []
+        for root, _, files in os.walk(self.directory):
+            prefix = os.path.basename(root)
+            for name in files:
+                if not name.endswith(".z"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                found.append((st.st_mtime, prefix + name[:-2], st.st_size))
+        for _, sha, size in sorted(found):
+            self._entries[sha] = size
+            self._total += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used blobs until the cache fits its budget."""
+        while self._total > self.max_bytes and self._entries:
+            sha, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(sha))
+            except OSError:
+                pass
+
+    def _forget(self, sha: str) -> None:
+        size = self._entries.pop(sha, None)
+        if size is not None:
+            self._total -= size
+
+    def get(self, sha: str) -> bytes | None:
+        """Return the cached blob for *sha* or None on a miss."""
+        sha = (sha or "").lower()
+        with self._lock:
+            if sha not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sha)
+        path = self._path(sha)
+        try:
+            with open(path, "rb") as f:
+                data = zlib.decompress(f.read())
+            os.utime(path)
+        except (OSError, zlib.error) as exc:
+            logging.debug(f"Discarding unreadable cached blob {sha}: {exc}")
+            with self._lock:
+                self._forget(sha)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, sha: str, data: bytes) -> None:
+        """Store *data* under *sha*, evicting old blobs when over budget."""
+        sha = (sha or "").lower()
+        if not SHA_RE.match(sha):
+            return
+        compressed = zlib.compress(data, 6)
+        if len(compressed) > self.max_bytes:
+            return
+        path = self._path(sha)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logging.debug(f"Failed to cache blob {sha}: {exc}")
+            return
+        with self._lock:
+            self._forget(sha)
+            self._entries[sha] = len(compressed)
+            self._total += len(compressed)
+            self._evict()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._total,
+            }
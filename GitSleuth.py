@@ -1,10 +1,13 @@
 #GitSleuth.py
 import os
 import time
+import numpy as np
 import pandas as pd
 import json
 import logging
 import re
+import tarfile
+from collections import Counter
 from GitSleuth_Groups import (
     create_search_queries,
     get_query_description,
@@ -23,12 +26,24 @@ from colorama import init, Fore, Style
 
 # Initialize color handling for consistent snippet highlighting
 init(autoreset=True)
-from GitSleuth_API import RateLimitException
+from GitSleuth_API import CodeSearchPaginator, RateLimitException
 from Token_Manager import load_tokens, switch_token as rotate_token
-from Secret_Scanner import snippet_has_secret, gitleaks_has_secret
-from Pattern_Detector import is_env_var_name, is_token
+from Secret_Scanner import DEFAULT_GITLEAKS_EXECUTABLE, get_detect_secrets_scanner, gitleaks_scan_batch
+from Verdict_Cache import DEFAULT_CACHE_FILE as DEFAULT_VERDICT_CACHE_FILE, DEFAULT_TTL_DAYS, get_verdict_cache
+from Pattern_Detector import DEFAULT_RULE_PACK, is_env_var_name, is_example_secret, is_token, load_rule_pack
+from Query_Sharder import ShardedCodeSearch
+from Git_Scanner import (
+    GitError,
+    HistoryCheckpoints,
+    iter_new_history,
+    iter_repository_blobs,
+    DEFAULT_CHECKPOINT_FILE,
+    DEFAULT_GIT_EXECUTABLE,
+)
+import bisect
+import functools
 import math
-from typing import Optional
+from typing import NamedTuple, Optional
 
 
 
@@ -36,6 +51,13 @@ from typing import Optional
 # Configuration file for storing the API tokens and settings
 CONFIG_FILE = 'config.json'
 
+# Hits from one repository in a single page of results at which the whole
+# repository is scanned from its tarball (TARBALL_THRESHOLD, 0 disables).
+DEFAULT_TARBALL_THRESHOLD = 25
+# Files verified together by the whole-repository scans when external
+# scanners are enabled, so gitleaks starts once per batch
+SCAN_BATCH_FILES = 200
+
 def load_config():
     """Load configuration from ``config.json`` and available GitHub tokens."""
     try:
@@ -57,7 +79,7 @@ def oauth_login_flow():
     else:
         print("OAuth login failed.")
 
-def process_search_item(item, query, headers, all_data, filter_placeholders=True):
+def process_search_item(item, query, headers, all_data, filter_placeholders=True, detector=None):
     """
     Processes a single item from GitHub search results.
 
@@ -67,6 +89,8 @@ def process_search_item(item, query, headers, all_data, filter_placeholders=True
     - headers (dict): The headers used for API requests.
     - all_data (list): A list to store the processed data.
     - filter_placeholders (bool): Whether to ignore placeholder snippets.
+    - detector (SnippetDetector): Precompiled rules for ``query``; built
+      from the configuration when not given.
 
     This function extracts relevant information from the item, such as repository name,
     file path, and file contents. It then extracts snippets from the contents based
@@ -76,19 +100,15 @@ def process_search_item(item, query, headers, all_data, filter_placeholders=True
     file_path = item.get('path', '')
     
     # Fetching file contents
-    file_contents = GitSleuth_API.get_file_contents(repo_name, file_path, headers)
+    file_contents = GitSleuth_API.get_file_contents(
+        repo_name, file_path, headers, sha=item.get('sha')
+    )
     
     if file_contents:
         # Extracting snippets based on the query
-        cfg = load_config()
-        placeholders = cfg.get("FILTER_PLACEHOLDERS", True)
-        allowlist = cfg.get("ALLOWLIST_PATTERNS", [])
-        snippets = extract_snippets(
-            file_contents,
-            query,
-            filter_placeholders=placeholders,
-            allowlist_patterns=allowlist,
-        )
+        if detector is None:
+            detector = SnippetDetector.from_config(query, filter_placeholders=filter_placeholders)
+        snippets = extract_snippets(file_contents, query, detector=detector)
         logging.info(f"Processed {len(snippets)} snippets from {repo_name}/{file_path}")
 
         # Adding data to all_data list
@@ -257,7 +277,11 @@ def highlight_search_term(snippet, search_term, color=Fore.RED):
 
 def perform_api_request_with_token_rotation(query, config, max_retries=3):
     """
-    Performs a GitHub API request with token rotation in case of rate limiting.
+    Performs a GitHub code search with token rotation in case of rate limiting.
+
+    Every page up to GitHub's 1000-result cap is fetched through
+    :class:`CodeSearchPaginator`, which resumes from the failed page after a
+    rate limit.
 
     Parameters:
     - query (str): The search query for the GitHub API.
@@ -265,33 +289,22 @@ def perform_api_request_with_token_rotation(query, config, max_retries=3):
     - max_retries (int): Maximum number of retries for the request in case of rate limit.
 
     Returns:
-    - dict or None: The API response, or None if unsuccessful after retries.
+    - dict or None: ``total_count``, ``incomplete_results`` and the ``items``
+      of all pages, or None if unsuccessful after retries.
     """
-    retry_count = 0
-    while retry_count < max_retries:
-        headers = GitSleuth_API.get_headers()
-        try:
-            search_results = GitSleuth_API.search_github_code(query, headers)
-            if 'items' in search_results:
-                return search_results
-            else:
-                logging.info(f"No results found for query: {query}")
-                return None
-        except RateLimitException as e:
-            logging.warning(str(e))
-
-            if retry_count < max_retries - 1 and switch_token(config):
-                retry_count += 1
-            else:
-                wait_time = getattr(e, 'wait_time', 60)
-                logging.info(f"Waiting {int(wait_time)} seconds for rate limit reset.")
-                time.sleep(wait_time)
-                retry_count += 1
-            retry_count += 1
-
-
-    logging.error("Max retries reached. Unable to complete the API request.")
-    return None
+    pages = CodeSearchPaginator(query, GitSleuth_API.get_headers("code_search"))
+    items = []
+    if not run_code_search(pages, lambda page: items.extend(page['items']), config, max_retries):
+        logging.error("Max retries reached. Unable to complete the API request.")
+        return None
+    if not items:
+        logging.info(f"No results found for query: {query}")
+        return None
+    return {
+        'total_count': pages.total_count,
+        'incomplete_results': pages.incomplete_results,
+        'items': items,
+    }
 
 def process_and_display_data(data, search_term, description=""):
     """
@@ -329,12 +342,170 @@ def process_and_display_data(data, search_term, description=""):
 
     print(table)
 
-def process_search_results(search_results, all_data, query, headers, group_name, ignored_filenames, domain, filter_placeholders=True):
+def select_tarball_repos(items, threshold, exclude=()):
+    """Return the repositories with at least ``threshold`` hits in ``items``."""
+    if not threshold or threshold <= 0:
+        return set()
+    counts = Counter(item['repository']['full_name'] for item in items)
+    return {
+        repo for repo, count in counts.items()
+        if count >= threshold and repo not in exclude
+    }
+
+
+def scan_repository_tarball(repo_name, detector, headers, scanned_paths=None):
+    """Scan every file of a repository from its tarball.
+
+    ``extract_snippets`` and ``find_high_entropy_snippets`` are run over each
+    member of the streamed archive, in batches (see :func:`scan_contents_batched`).
+
+    Parameters
+    ----------
+    detector : SnippetDetector
+        Rules for the query being searched; ignored paths are skipped.
+    scanned_paths : set or None, optional
+        Receives the path of every member whose scan completed, so callers
+        know which files still need fetching if the download fails part way.
+
+    Yields
+    ------
+    tuple
+        ``(file_path, snippets)`` for files with findings.
+    """
+    def members():
+        for file_path, contents in GitSleuth_API.iter_repo_tarball(repo_name, headers):
+            if detector.is_ignored_path(file_path):
+                if scanned_paths is not None:
+                    scanned_paths.add(file_path)
+                continue
+            yield file_path, contents
+
+    files = members()
+    try:
+        for file_path, snippets in scan_contents_batched(files, detector):
+            if scanned_paths is not None:
+                scanned_paths.add(file_path)
+            if snippets:
+                yield file_path, snippets
+    finally:
+        files.close()
+
+
+def _add_entropy_snippets(snippets, entropy_snippets):
+    seen = set(snippets)
+    for snippet in entropy_snippets:
+        if snippet not in seen:
+            seen.add(snippet)
+            snippets.append(snippet)
+    return snippets
+
+
+def scan_contents(contents, detector):
+    """Return query snippets and high entropy lines found in ``contents``.
+
+    Used by the whole-repository scans, which look at files that did not
+    necessarily match the search query.
+    """
+    return _add_entropy_snippets(
+        detector.scan(contents),
+        find_high_entropy_snippets(contents, entropy_threshold=detector.entropy_threshold),
+    )
+
+
+def scan_contents_batched(files, detector, batch_size=SCAN_BATCH_FILES):
+    """Yield ``(key, snippets)`` as :func:`scan_contents` would for each ``(key, contents)``.
+
+    With external scanners enabled, files are submitted as they are read
+    and collected *batch_size* at a time, so gitleaks starts once per batch
+    rather than once per file. Every file is yielded, in input order, even
+    when nothing was found in it.
+    """
+    if not detector.uses_external_scanners:
+        for key, contents in files:
+            yield key, scan_contents(contents, detector)
+        return
+
+    batch = []
+
+    def collect():
+        found = detector.collect(scan for _, scan, _ in batch)
+        results = [
+            (key, _add_entropy_snippets(snippets, entropy_snippets))
+            for (key, _, entropy_snippets), snippets in zip(batch, found)
+        ]
+        batch.clear()
+        return results
+
+    for key, contents in files:
+        batch.append((
+            key,
+            detector.submit([contents]),
+            find_high_entropy_snippets(contents, entropy_threshold=detector.entropy_threshold),
+        ))
+        if len(batch) >= batch_size:
+            yield from collect()
+    if batch:
+        yield from collect()
+
+
+def scan_local_repository(repo_path, query, all_data, filter_placeholders=True, seen_blobs=None):
+    """
+    Scans every blob in the history of a local or bare repository.
+
+    Blobs are enumerated with ``git rev-list --objects --all`` and read
+    through a single ``git cat-file --batch`` process, so no API requests
+    are made and no rate limits apply.
+
+    Parameters:
+    - repo_path (str): Path to the working tree or bare repository.
+    - query (str): Search terms used to extract snippets.
+    - all_data (list): The list to append findings to.
+    - filter_placeholders (bool): Whether to ignore placeholder snippets.
+    - seen_blobs (set): Blob SHAs already scanned; shared between
+      repositories to skip common history.
+    """
+    config = load_config()
+    detector = SnippetDetector.from_config(query, config, filter_placeholders=filter_placeholders)
+    blobs = iter_repository_blobs(
+        repo_path,
+        seen=seen_blobs,
+        max_bytes=config.get("MAX_FILE_BYTES", GitSleuth_API.DEFAULT_MAX_FILE_BYTES),
+        git=config.get("GIT_EXECUTABLE", DEFAULT_GIT_EXECUTABLE),
+    )
+    scanned = 0
+
+    def files():
+        nonlocal scanned
+        for sha, file_path, contents in blobs:
+            scanned += 1
+            if not detector.is_ignored_path(file_path):
+                yield (sha, file_path), contents
+
+    for (sha, file_path), snippets in scan_contents_batched(files(), detector):
+        if snippets:
+            file_data = {
+                'repo': repo_path,
+                'file_path': file_path,
+                'sha': sha,
+                'snippets': snippets,
+                'entropy_scores': [get_secret_entropy(s, query_terms=detector.query_terms, rule_pack=detector.rule_pack) for s in snippets],
+                'search_term': query,
+                'description': "Local repository scan",
+            }
+            all_data.append(file_data)
+            process_and_display_data(file_data, query, file_data['description'])
+    logging.info(f"Scanned {scanned} blobs in {repo_path}")
+
+
+def process_search_results(search_results, all_data, query, headers, group_name, ignored_filenames, domain,
+                           filter_placeholders=True, tarball_scans=None, detector=None, handled_items=None):
     """
     Processes search results, extracting file contents and snippets.
 
     Iterates over search results, handles API requests for file contents,
     and extracts relevant snippets. Appends processed data to a list.
+    Repositories with at least ``TARBALL_THRESHOLD`` hits in the page are
+    scanned as a whole from their tarball instead of file by file.
 
     Parameters:
     - search_results (dict): The search results from the GitHub API.
@@ -345,45 +516,134 @@ def process_search_results(search_results, all_data, query, headers, group_name,
     - group_name (str): The name of the search group.
     - ignored_filenames (list): List of filenames to ignore in the search.
     - filter_placeholders (bool): Whether to ignore placeholder snippets.
+    - tarball_scans (dict): Repositories already scanned from a tarball for
+      this query, mapped to whether the scan completed. Pass the same dict
+      for every page of a query so each tarball is downloaded once.
+    - detector (SnippetDetector): Precompiled rules for ``query``. Pass the
+      same detector for every page; built from the configuration when not given.
+    - handled_items (set): ``(repository, path)`` of the files already
+      processed for this query. Files in it are skipped and processed files
+      are added, so a page repeated after a rate limit is not reported twice.
     """
     description = get_query_description(query, domain)
     config = load_config()
-    ignored_patterns = config.get("IGNORED_PATH_PATTERNS", [])
-    query_terms = extract_search_terms(query)
-    for item in search_results['items']:
+    if detector is None:
+        detector = SnippetDetector.from_config(query, config, filter_placeholders=filter_placeholders)
+    query_terms = detector.query_terms
+    if tarball_scans is None:
+        tarball_scans = {}
+
+    def report(repo_name, file_path, snippets):
+        entropies = [
+            get_secret_entropy(s, query_terms=query_terms, rule_pack=detector.rule_pack) for s in snippets
+        ]
+        file_data = {
+            'repo': repo_name,
+            'file_path': file_path,
+            'snippets': snippets,
+            'entropy_scores': entropies,
+            'search_term': query,
+            'group': group_name,
+            'description': description,
+        }
+        all_data.append(file_data)
+        process_and_display_data(file_data, query, description)  # Pass query as search_term
+
+    if handled_items is None:
+        handled_items = set()
+    items = [
+        item for item in search_results['items']
+        if item.get('path', '') not in ignored_filenames
+        and not detector.is_ignored_path(item.get('path', ''))
+        and (item['repository']['full_name'], item.get('path', '')) not in handled_items
+    ]
+    threshold = config.get("TARBALL_THRESHOLD", DEFAULT_TARBALL_THRESHOLD)
+    partial_scans = {}
+    for repo_name in sorted(select_tarball_repos(items, threshold, exclude=tarball_scans)):
+        logging.info(f"Scanning {repo_name} from its tarball")
+        scanned = partial_scans[repo_name] = set()
+        try:
+            for file_path, snippets in scan_repository_tarball(
+                repo_name, detector, headers, scanned_paths=scanned
+            ):
+                if file_path not in ignored_filenames:
+                    report(repo_name, file_path, snippets)
+            tarball_scans[repo_name] = True
+        except (RateLimitException, requests.RequestException, tarfile.TarError) as e:
+            logging.warning(f"Tarball scan of {repo_name} failed, fetching files individually: {e}")
+            tarball_scans[repo_name] = False
+        handled_items.update((repo_name, path) for path in scanned)
+    items = [
+        item for item in items
+        if not tarball_scans.get(item['repository']['full_name'])
+        and item.get('path', '') not in partial_scans.get(item['repository']['full_name'], ())
+    ]
+
+    fetched = GitSleuth_API.fetch_file_contents_concurrently(items, headers)
+    page_snippets = None
+    if detector.uses_external_scanners:
+        # Files are verified in the background while the rest of the page
+        # downloads; gitleaks then runs once for the whole page
+        fetched = [
+            (item, contents, extract_snippets(contents or "", query, detector=detector, wait=False))
+            for item, contents in fetched
+        ]
+        page_snippets = detector.collect(scan for _, _, scan in fetched)
+        fetched = [(item, contents) for item, contents, _ in fetched]
+    for index, (item, file_contents) in enumerate(fetched):
         file_path = item.get('path', '')
-        if file_path in ignored_filenames or _path_is_ignored(file_path, ignored_patterns):
-            continue
         repo_name = item['repository']['full_name']
-        try:
-            file_contents = GitSleuth_API.get_file_contents(repo_name, file_path, headers)
-            if file_contents:
-                allowlist = config.get("ALLOWLIST_PATTERNS", [])
-                snippets = extract_snippets(
-                    file_contents,
-                    query,
-                    filter_placeholders=filter_placeholders,
-                    allowlist_patterns=allowlist,
-                )
-                if snippets:
-                    entropies = [get_secret_entropy(s, query_terms=query_terms) for s in snippets]
-                    file_data = {
-                        'repo': repo_name,
-                        'file_path': file_path,
-                        'snippets': snippets,
-                        'entropy_scores': entropies,
-                        'search_term': query,
-                        'group': group_name,
-                        'description': description,
-                    }
-                    all_data.append(file_data)
-                    process_and_display_data(file_data, query, description)  # Pass query as search_term
-                else:
-                    logging.info(f"No relevant snippets found in {file_path} for query '{query}'")
+        if file_contents:
+            if page_snippets is not None:
+                snippets = page_snippets[index]
             else:
-                logging.info(f"No file contents found for {file_path}")
-        except requests.RequestException as e:
-            logging.error(f"Failed to fetch file contents: {e}")
+                snippets = extract_snippets(file_contents, query, detector=detector)
+            if snippets:
+                report(repo_name, file_path, snippets)
+            else:
+                logging.info(f"No relevant snippets found in {file_path} for query '{query}'")
+        else:
+            logging.info(f"No file contents found for {file_path}")
+        handled_items.add((repo_name, file_path))
+
+
+def run_code_search(pages, handle_page, config, max_retries=3):
+    """
+    Calls ``handle_page`` for every page of a code search, waiting out rate limits.
+
+    A :class:`RateLimitException` raised while a page is requested or
+    processed switches to another token, or waits for the reset when there
+    is none, and iterates ``pages`` again. The paginator then repeats the
+    interrupted page, so ``handle_page`` should skip files it already
+    processed. ``handle_page`` reads ``pages.headers`` for the current token.
+
+    Parameters:
+    - pages (ShardedCodeSearch): The paginated search.
+    - handle_page (callable): Called with each page of results.
+    - config (dict): Configuration with GitHub tokens.
+    - max_retries (int): Consecutive rate limits after which the search stops.
+
+    Returns:
+    - bool: True if every page was processed.
+    """
+    retry_count = 0
+    while True:
+        try:
+            for search_results in pages:
+                handle_page(search_results)
+                retry_count = 0
+            return True
+        except RateLimitException as e:
+            retry_count += 1
+            logging.warning(f"Rate limit reached: {e}")
+            if retry_count >= max_retries:
+                logging.error(f"Max retries reached, stopping search for: {pages.query}")
+                return False
+            if not switch_token(config):
+                wait_time = getattr(e, 'wait_time', 60)
+                logging.info(f"Waiting {int(wait_time)} seconds for rate limit reset.")
+                time.sleep(wait_time)
+            pages.headers = GitSleuth_API.get_headers("code_search")
 
 def initialize_logging():
     """
@@ -548,6 +808,12 @@ PLACEHOLDER_VALUES = {
 # to be considered a real secret.
 DEFAULT_ENTROPY_THRESHOLD = 4.0
 
+# Context captured around each query term, and the longest snippet that
+# overlapping windows are merged into
+SNIPPET_CONTEXT_BEFORE = 40
+SNIPPET_CONTEXT_AFTER = 100
+MAX_SNIPPET_SPAN = 500
+
 # Inline pragma used by detect-secrets to suppress findings
 ALLOWLIST_PRAGMA_RE = re.compile(r"#\s*pragma:\s*allowlist secret", re.I)
 
@@ -595,6 +861,31 @@ def _shannon_entropy(data: str) -> float:
     return entropy
 
 
+def _shannon_entropy_batch(strings) -> np.ndarray:
+    """Return the Shannon entropy of every string in *strings*.
+
+    Gives the same values as :func:`_shannon_entropy` but computes the
+    character histograms of all strings at once: the code points are
+    tagged with the index of their string and counted with ``np.unique``.
+    """
+    strings = list(strings)
+    count = len(strings)
+    if not count:
+        return np.zeros(0)
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=count)
+    # Lone surrogates (e.g. from undecodable file bytes) are kept as their
+    # own code points instead of failing the encode
+    codes = np.frombuffer(
+        "".join(strings).encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32
+    )
+    owners = np.repeat(np.arange(count, dtype=np.int64), lengths)
+    # Code points fit in 21 bits, so the string index goes above them
+    keys, counts = np.unique((owners << 21) | codes, return_counts=True)
+    owners = keys >> 21
+    p = counts / lengths[owners]
+    return np.bincount(owners, weights=-p * np.log2(p), minlength=count)
+
+
 def _looks_like_word(text: str) -> bool:
     """Return True if *text* resembles a human-readable word."""
     if not text.isalpha():
@@ -614,33 +905,89 @@ def _matches_known_format(text: str) -> bool:
     )
 
 
-def _has_allowlist_comment(content: str, start: int, end: int) -> bool:
-    """Return True if an allowlist pragma appears near the snippet."""
+# Number of distinct candidate values whose classification is memoized
+VALUE_CACHE_SIZE = 65536
+
+
+class ValueClassification(NamedTuple):
+    """Properties of a candidate secret value that do not depend on its context."""
+
+    normalized: str
+    placeholder: bool
+    marker: bool
+    known_format: bool
+    word: bool
+    entropy: float
+
+
+@functools.lru_cache(maxsize=VALUE_CACHE_SIZE)
+def classify_value(value: str) -> ValueClassification:
+    """Classify a cleaned candidate value, memoizing the result.
+
+    The same values (``changeme``, keys copied from tutorials) show up in
+    many files and queries, so the format checks and the entropy are only
+    computed the first time a value is seen. ``placeholder`` flags empty,
+    numeric and well-known dummy values; ``marker`` flags values written in
+    capitals or mentioning SECRET or PASSWORD.
+    """
+    upper = value.upper()
+    return ValueClassification(
+        normalized=re.sub(r"[^a-z0-9]", "", value.lower()),
+        placeholder=not value or value in PLACEHOLDER_VALUES or value.isdigit(),
+        marker=value.isupper() or "SECRET" in upper or "PASSWORD" in upper,
+        known_format=_matches_known_format(value),
+        word=_looks_like_word(value),
+        entropy=_shannon_entropy(value),
+    )
+
+
+def classification_cache_info():
+    """Return hit/miss statistics of the value classification cache."""
+    return classify_value.cache_info()
+
+
+def _allowlist_pragmas(content: str) -> list[tuple[int, int]]:
+    """Return the offsets of every allowlist pragma in *content*, in order."""
+    return [m.span() for m in ALLOWLIST_PRAGMA_RE.finditer(content)]
+
+
+def _near_allowlist_pragma(pragmas, pragma_starts, length, start, end) -> bool:
+    """Return True if an allowlist pragma lies within 100 characters of the snippet.
+
+    ``pragmas`` come from :func:`_allowlist_pragmas` and ``pragma_starts``
+    are their start offsets.
+    """
     context_start = max(0, start - 100)
-    context_end = min(len(content), end + 100)
-    return bool(ALLOWLIST_PRAGMA_RE.search(content[context_start:context_end]))
+    context_end = min(length, end + 100)
+    index = bisect.bisect_left(pragma_starts, context_start)
+    return index < len(pragmas) and pragmas[index][1] <= context_end
 
 
-def _path_is_ignored(file_path: str, patterns: list[str]) -> bool:
-    """Return True if file_path matches any ignore pattern."""
-    return any(re.search(p, file_path) for p in patterns)
+@functools.lru_cache(maxsize=None)
+def _keyword_secret_re(keywords: tuple[str, ...]) -> re.Pattern:
+    """Return the compiled regex matching values assigned after *keywords*."""
+    return re.compile(
+        r"(?:" + "|".join(re.escape(k) for k in keywords) + r")\s*[=:]\s*[\'\"]?([^\'\"\s,;]+)[\'\"]?",
+        re.IGNORECASE,
+    )
 
 
 def extract_secrets(snippet: str, keywords: list[str] | None = None) -> list[str]:
     """Return all secrets appearing after keywords in the snippet."""
     if keywords is None:
         keywords = PRECEDING_KEYWORDS
-    pattern = re.compile(
-        r"(?:" + "|".join(re.escape(k) for k in keywords) + r")\s*[=:]\s*[\'\"]?([^\'\"\s,;]+)[\'\"]?",
-        re.IGNORECASE,
-    )
-    return pattern.findall(snippet)
+    return _keyword_secret_re(tuple(keywords)).findall(snippet)
 
 
-def _is_placeholder_snippet(snippet, query_terms=None, entropy_threshold=DEFAULT_ENTROPY_THRESHOLD):
+def _is_placeholder_snippet(snippet, query_terms=None, entropy_threshold=DEFAULT_ENTROPY_THRESHOLD,
+                            rule_pack=None):
     """Return True if the snippet only contains placeholder assignments or
     references environment variables.
 
+    A query-matched assignment whose value is in a provider's secret format
+    (see ``Pattern_Detector``) is never treated as a placeholder, unless the
+    value is a well-known documentation example.
+
     Parameters
     ----------
     snippet : str
@@ -651,8 +998,11 @@ def _is_placeholder_snippet(snippet, query_terms=None, entropy_threshold=DEFAULT
         these terms are considered when determining if the snippet is a
         placeholder. This helps avoid false positives caused by unrelated
         variables with real values in the same snippet.
+    rule_pack : Pattern_Detector.RulePack or None, optional
+        Provider rules to apply; the built-in rules by default.
     """
 
+    rule_pack = rule_pack or DEFAULT_RULE_PACK
     if re.search(r"<[^>]+>", snippet):
         return True
     if re.search(r"\${[^}]+}", snippet):
@@ -675,32 +1025,36 @@ def _is_placeholder_snippet(snippet, query_terms=None, entropy_threshold=DEFAULT
         # remove common markup emphasis characters
         clean = clean.strip('*_`')
 
-        if clean and clean not in PLACEHOLDER_VALUES and not clean.isdigit():
+        if rule_pack.match(clean) and not is_example_secret(clean):
+            return False
+        info = classify_value(clean)
+        if not info.placeholder:
             norm_var = re.sub(r"[^a-z0-9]", "", var.lower())
-            norm_val = re.sub(r"[^a-z0-9]", "", clean.lower())
-            if norm_val == norm_var or norm_var in norm_val:
+            if info.normalized == norm_var or norm_var in info.normalized:
                 continue
-            upper = clean.upper()
-            if clean.isupper() or "SECRET" in upper or "PASSWORD" in upper:
+            if info.marker:
                 continue
-            if _matches_known_format(clean) or _looks_like_word(clean):
+            if info.known_format or info.word:
                 continue
-            if _shannon_entropy(clean) > entropy_threshold:
+            if info.entropy > entropy_threshold:
                 return False
 
     return found
 
 
-def get_secret_entropy(snippet: str, query_terms=None) -> Optional[float]:
+def get_secret_entropy(snippet: str, query_terms=None, rule_pack=None) -> Optional[float]:
     """Return the entropy of an assigned secret in *snippet*.
 
     The function looks for ``VAR=VALUE`` assignments that match one of
     the provided query terms and returns the Shannon entropy of the
     assigned value if it resembles a real secret. Placeholder values
     containing the variable name, the words ``SECRET`` or ``PASSWORD`` or
-    written entirely in uppercase are ignored.
+    written entirely in uppercase are ignored, unless the value matches a
+    provider rule in *rule_pack* (such as an AWS access key ID) and is not a
+    documentation example.
     """
 
+    rule_pack = rule_pack or DEFAULT_RULE_PACK
     assignments = ENV_ASSIGN_RE.findall(snippet)
     query_vars = {t.upper() for t in query_terms} if query_terms else None
     entropies = []
@@ -711,33 +1065,492 @@ def get_secret_entropy(snippet: str, query_terms=None) -> Optional[float]:
         clean = val.strip('"\'').strip().strip('*_`')
         if not clean:
             continue
+        info = classify_value(clean)
+        if rule_pack.match(clean) and not is_example_secret(clean):
+            entropies.append(info.entropy)
+            continue
         norm_var = re.sub(r"[^a-z0-9]", "", var.lower())
-        norm_val = re.sub(r"[^a-z0-9]", "", clean.lower())
-        upper = clean.upper()
         if (
-            norm_val == norm_var
-            or norm_var in norm_val
-            or clean.isupper()
-            or "SECRET" in upper
-            or "PASSWORD" in upper
-            or _matches_known_format(clean)
-            or _looks_like_word(clean)
+            info.normalized == norm_var
+            or norm_var in info.normalized
+            or info.marker
+            or info.known_format
+            or info.word
         ):
             continue
-        entropies.append(_shannon_entropy(clean))
+        entropies.append(info.entropy)
 
     # Also look for secrets using common keywords
     for secret in extract_secrets(snippet):
         clean = secret.strip('"\'').strip().strip('*_`')
         if not clean:
             continue
-        if _matches_known_format(clean) or _looks_like_word(clean) or clean.isupper():
+        info = classify_value(clean)
+        provider_secret = rule_pack.match(clean) and not is_example_secret(clean)
+        if not provider_secret and (info.known_format or info.word or clean.isupper()):
             continue
-        entropies.append(_shannon_entropy(clean))
+        entropies.append(info.entropy)
 
     return max(entropies) if entropies else None
 
-def extract_snippets(content, query, filter_placeholders=True, allowlist_patterns=None):
+class _LineIndex:
+    """Map offsets in a text to 1-based line numbers, indexing newlines on first use."""
+
+    __slots__ = ("content", "_newlines")
+
+    def __init__(self, content):
+        self.content = content
+        self._newlines = None
+
+    def line_of(self, offset):
+        if self._newlines is None:
+            self._newlines = [m.start() for m in re.finditer("\n", self.content)]
+        return bisect.bisect_left(self._newlines, offset) + 1
+
+
+class SnippetSpan:
+    """A snippet located by its offsets in the scanned content.
+
+    All offsets (``start``/``end``, ``term_start``/``term_end`` and the
+    ``windows``) are character indexes into the decoded ``content`` string,
+    not byte offsets into the file. ``start``/``end`` delimit the snippet,
+    ``line`` is the 1-based line of the first matched term and ``term`` the
+    text it matched. ``windows`` holds the ``(start, end)`` context window
+    of every term occurrence merged into the span. ``rule`` names the
+    provider rule (see ``Pattern_Detector``) for a span reporting a provider
+    secret, whose ``term`` is then the secret itself; its text is prefixed
+    with ``[<rule>]``. The snippet text and the secret value are only
+    extracted when first accessed.
+    """
+
+    __slots__ = (
+        "content", "start", "end", "term_start", "term_end", "windows", "rule",
+        "_lines", "_detector", "_text",
+    )
+
+    def __init__(self, content, start, end, term_start, term_end, lines, detector, windows=None,
+                 rule=None):
+        self.content = content
+        self.start = start
+        self.end = end
+        self.term_start = term_start
+        self.term_end = term_end
+        self.windows = windows or ((start, end),)
+        self.rule = rule
+        self._lines = lines
+        self._detector = detector
+        self._text = None
+
+    @property
+    def text(self):
+        """Snippet text on a single line, as returned by :func:`extract_snippets`."""
+        if self._text is None:
+            text = self.content[self.start:self.end].replace('\n', ' ').strip()
+            self._text = f"[{self.rule}] {text}" if self.rule else text
+        return self._text
+
+    def window_texts(self):
+        """Return the text of each merged term window, normalized like :attr:`text`."""
+        if len(self.windows) == 1:
+            return [self.text]
+        return [self.content[start:end].replace('\n', ' ').strip() for start, end in self.windows]
+
+    @property
+    def line(self):
+        return self._lines.line_of(self.term_start)
+
+    @property
+    def term(self):
+        return self.content[self.term_start:self.term_end]
+
+    @property
+    def secret(self):
+        """The provider secret, else the first value assigned after a secret keyword, or None."""
+        if self.rule:
+            return self.term
+        secrets = self._detector.extract_secrets(self.text)
+        return secrets[0] if secrets else None
+
+    @property
+    def secret_type(self):
+        """Description of the provider rule that found the secret, or None."""
+        if not self.rule:
+            return None
+        rule = self._detector.rule_pack.by_name.get(self.rule)
+        return rule.description if rule and rule.description else self.rule
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"SnippetSpan(start={self.start}, end={self.end}, line={self.line}, term={self.term!r})"
+
+
+def _compile_terms(terms, flags=0):
+    """Return one regex finding every term of ``terms`` in a single pass.
+
+    The alternation is wrapped in a lookahead so overlapping occurrences
+    are reported, and longer terms are tried first. A leading character
+    class lets the scan skip positions that cannot start a term.
+    """
+    terms = sorted((t for t in terms if t), key=lambda t: (-len(t), t))
+    if not terms:
+        return None
+    first = "".join(sorted({re.escape(t[0]) for t in terms}))
+    alternation = "|".join(re.escape(t) for t in terms)
+    return re.compile(f"(?=[{first}])(?=({alternation}))", flags)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_rule_pack(path, mtime):
+    return load_rule_pack(path)
+
+
+def rule_pack_from_config(config):
+    """Return the provider rules, extended with ``RULE_PACK_FILE`` when set.
+
+    The file is reloaded when it changes. An unreadable or invalid file is
+    logged and the built-in rules are used.
+    """
+    path = config.get("RULE_PACK_FILE")
+    if not path:
+        return DEFAULT_RULE_PACK
+    try:
+        return _load_rule_pack(path, os.path.getmtime(path))
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring rule pack {path}: {e}")
+        return DEFAULT_RULE_PACK
+
+
+def verdict_cache_from_config(config):
+    """Return the shared scanner verdict cache.
+
+    None when ``USE_VERDICT_CACHE`` is off or no external scanner is enabled.
+    """
+    if not config.get("USE_VERDICT_CACHE", True):
+        return None
+    if not (config.get("USE_DETECT_SECRETS") or config.get("USE_GITLEAKS")):
+        return None
+    return get_verdict_cache(
+        config.get("VERDICT_CACHE_FILE") or DEFAULT_VERDICT_CACHE_FILE,
+        float(config.get("VERDICT_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS)) * 86400,
+    )
+
+
+class PendingScan:
+    """Candidate snippets of some files whose external verification is under way."""
+
+    __slots__ = ("per_file", "texts", "verdicts", "return_spans", "provider")
+
+    def __init__(self, per_file, texts, verdicts, return_spans, provider=None):
+        self.per_file = per_file
+        self.texts = texts
+        # Provider secrets of each file; they need no external verification
+        self.provider = provider or [[] for _ in per_file]
+        # Future of the detect-secrets verdicts, None when it is not used
+        self.verdicts = verdicts
+        self.return_spans = return_spans
+
+
+class SnippetDetector:
+    """Compiled snippet extraction rules for one query.
+
+    Build it once per search with :meth:`from_config` and reuse it for
+    every file, so the configuration is read and the term, allowlist,
+    keyword and ignore-path regexes are compiled only once. Instances are
+    immutable and can be shared between threads.
+    """
+
+    __slots__ = (
+        "query",
+        "query_terms",
+        "filter_placeholders",
+        "entropy_threshold",
+        "use_detect_secrets",
+        "baseline",
+        "secrets_scanner",
+        "use_gitleaks",
+        "gitleaks_config",
+        "gitleaks_executable",
+        "verdict_cache",
+        "rule_pack",
+        "ignored_filenames",
+        "term_re",
+        "term_re_ci",
+        "allowlist_res",
+        "keyword_re",
+        "ignore_path_res",
+    )
+
+    def __init__(self, query, allowlist_patterns=(), ignored_path_patterns=(),
+                 ignored_filenames=(), filter_placeholders=True,
+                 entropy_threshold=DEFAULT_ENTROPY_THRESHOLD, use_detect_secrets=False,
+                 baseline=None, use_gitleaks=False, gitleaks_config=None,
+                 keywords=None, detect_secrets_processes=0,
+                 gitleaks_executable=DEFAULT_GITLEAKS_EXECUTABLE, verdict_cache=None,
+                 rule_pack=None):
+        query_terms = tuple(extract_search_terms(query))
+        values = {
+            "query": query,
+            "query_terms": query_terms,
+            "filter_placeholders": filter_placeholders,
+            "entropy_threshold": entropy_threshold,
+            "use_detect_secrets": use_detect_secrets,
+            "baseline": baseline,
+            "secrets_scanner": (
+                get_detect_secrets_scanner(baseline, detect_secrets_processes, verdict_cache)
+                if use_detect_secrets else None
+            ),
+            "use_gitleaks": use_gitleaks,
+            "gitleaks_config": gitleaks_config,
+            "gitleaks_executable": gitleaks_executable,
+            "verdict_cache": verdict_cache,
+            "rule_pack": rule_pack or DEFAULT_RULE_PACK,
+            "ignored_filenames": frozenset(ignored_filenames or ()),
+            "term_re": _compile_terms({t.lower() for t in query_terms}),
+            "term_re_ci": _compile_terms(set(query_terms), re.IGNORECASE),
+            "allowlist_res": tuple(re.compile(p, re.I) for p in allowlist_patterns or ()),
+            "keyword_re": _keyword_secret_re(tuple(keywords or PRECEDING_KEYWORDS)),
+            "ignore_path_res": tuple(re.compile(p) for p in ignored_path_patterns or ()),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @classmethod
+    def from_config(cls, query, config=None, filter_placeholders=None, allowlist_patterns=None):
+        """Build a detector for ``query`` from ``config.json`` settings.
+
+        ``filter_placeholders`` and ``allowlist_patterns`` default to
+        ``FILTER_PLACEHOLDERS`` and ``ALLOWLIST_PATTERNS``.
+        """
+        if config is None:
+            config = load_config()
+        if filter_placeholders is None:
+            filter_placeholders = config.get("FILTER_PLACEHOLDERS", True)
+        if allowlist_patterns is None:
+            allowlist_patterns = config.get("ALLOWLIST_PATTERNS", [])
+        return cls(
+            query,
+            allowlist_patterns=allowlist_patterns,
+            ignored_path_patterns=config.get("IGNORED_PATH_PATTERNS", []),
+            ignored_filenames=config.get("IGNORED_FILENAMES", []),
+            filter_placeholders=filter_placeholders,
+            entropy_threshold=config.get("ENTROPY_THRESHOLD", DEFAULT_ENTROPY_THRESHOLD),
+            use_detect_secrets=config.get("USE_DETECT_SECRETS", False),
+            baseline=config.get("DETECT_SECRETS_BASELINE") or None,
+            detect_secrets_processes=config.get("DETECT_SECRETS_PROCESSES", 0),
+            use_gitleaks=config.get("USE_GITLEAKS", False),
+            gitleaks_config=config.get("GITLEAKS_CONFIG") or None,
+            gitleaks_executable=config.get("GITLEAKS_EXECUTABLE") or DEFAULT_GITLEAKS_EXECUTABLE,
+            verdict_cache=verdict_cache_from_config(config),
+            rule_pack=rule_pack_from_config(config),
+        )
+
+    @property
+    def uses_external_scanners(self):
+        """True when snippets are verified with detect-secrets or gitleaks."""
+        return self.secrets_scanner is not None or self.use_gitleaks
+
+    def is_ignored_path(self, file_path):
+        """Return True if ``file_path`` is an ignored filename or matches an ignore pattern."""
+        return file_path in self.ignored_filenames or any(
+            r.search(file_path) for r in self.ignore_path_res
+        )
+
+    def is_allowlisted(self, snippet):
+        """Return True if ``snippet`` matches an allowlist pattern."""
+        return any(r.search(snippet) for r in self.allowlist_res)
+
+    def extract_secrets(self, snippet):
+        """Return the values assigned after secret keywords in ``snippet``."""
+        return self.keyword_re.findall(snippet)
+
+    def find_secrets(self, content):
+        """Return the provider secrets in ``content`` as :class:`SnippetSpan` records.
+
+        Every rule of the rule pack is matched in one pass over the content.
+        Documentation examples, allowlisted lines and secrets near an
+        allowlist pragma are skipped. A span covers the line of the secret,
+        cut to the usual context window around it.
+        """
+        findings = [f for f in self.rule_pack.find(content) if not is_example_secret(f.value)]
+        if not findings:
+            return []
+        length = len(content)
+        pragmas = _allowlist_pragmas(content)
+        pragma_starts = [p[0] for p in pragmas]
+        lines = _LineIndex(content)
+        spans = []
+        for finding in findings:
+            line_end = content.find('\n', finding.end)
+            start = max(content.rfind('\n', 0, finding.start) + 1, finding.start - SNIPPET_CONTEXT_BEFORE)
+            end = min(length if line_end < 0 else line_end, finding.end + SNIPPET_CONTEXT_AFTER)
+            if pragmas and _near_allowlist_pragma(pragmas, pragma_starts, length, start, end):
+                continue
+            span = SnippetSpan(
+                content, start, end, finding.start, finding.end, lines, self, rule=finding.rule
+            )
+            if not self.is_allowlisted(span.text):
+                spans.append(span)
+        return spans
+
+    def find_terms(self, content):
+        """Yield ``(start, end)`` of the query term occurrences in ``content``.
+
+        All terms are found in one pass over a lowercased copy of the
+        content. Where several terms start at the same offset only the
+        longest is reported.
+        """
+        if self.term_re is None:
+            return
+        lowered = content.lower()
+        if len(lowered) == len(content):
+            matches = self.term_re.finditer(lowered)
+        else:
+            # Lowercasing changed the length (e.g. "\u0130"), so the offsets
+            # would not line up; fall back to case-insensitive matching
+            matches = self.term_re_ci.finditer(content)
+        for match in matches:
+            yield match.start(1), match.end(1)
+
+    def find_spans(self, content):
+        """Return the snippets in ``content`` as :class:`SnippetSpan` records.
+
+        Every term occurrence gets a window of ``SNIPPET_CONTEXT_BEFORE``
+        characters before and ``SNIPPET_CONTEXT_AFTER`` after it. Windows near
+        an allowlist pragma are dropped and overlapping windows are merged
+        into one span of at most ``MAX_SNIPPET_SPAN`` characters. The span
+        keeps the individual windows, so placeholder and allowlist checks
+        can look at each term occurrence on its own. Offsets are character
+        indexes into ``content``, not byte offsets.
+        """
+        windows = []
+        length = len(content)
+        pragmas = _allowlist_pragmas(content)
+        pragma_starts = [p[0] for p in pragmas]
+        for term_start, term_end in self.find_terms(content):
+            start = max(term_start - SNIPPET_CONTEXT_BEFORE, 0)
+            end = min(term_end + SNIPPET_CONTEXT_AFTER, length)
+            if pragmas and _near_allowlist_pragma(pragmas, pragma_starts, length, start, end):
+                continue
+            if windows and start <= windows[-1][1] and end - windows[-1][0] <= MAX_SNIPPET_SPAN:
+                windows[-1][1] = max(windows[-1][1], end)
+                windows[-1][4].append((start, end))
+            else:
+                windows.append([start, end, term_start, term_end, [(start, end)]])
+        lines = _LineIndex(content)
+        return [
+            SnippetSpan(content, start, end, term_start, term_end, lines, self, tuple(parts))
+            for start, end, term_start, term_end, parts in windows
+        ]
+
+    def _candidates(self, content):
+        """Return the distinct spans of ``content`` with a term window that is not allowlisted."""
+        seen = set()
+        candidates = []
+        for span in self.find_spans(content):
+            snippet = span.text
+            if snippet in seen:
+                continue
+            seen.add(snippet)
+            if any(
+                self.term_re_ci.search(text) and not self.is_allowlisted(text)
+                for text in span.window_texts()
+            ):
+                candidates.append(span)
+        return candidates
+
+    def _is_placeholder_span(self, span):
+        """Return True if every term window of ``span`` only holds placeholders."""
+        return all(
+            _is_placeholder_snippet(
+                text,
+                query_terms=self.query_terms,
+                entropy_threshold=self.entropy_threshold,
+                rule_pack=self.rule_pack,
+            )
+            for text in span.window_texts()
+        )
+
+    def _gitleaks_flags(self, snippets, flags):
+        """Return ``flags`` cleared for the snippets gitleaks finds nothing in."""
+        flags = list(flags)
+        if self.use_gitleaks:
+            pending = [i for i, flag in enumerate(flags) if flag]
+            if pending:
+                found = gitleaks_scan_batch(
+                    [snippets[i] for i in pending],
+                    config_file=self.gitleaks_config,
+                    executable=self.gitleaks_executable,
+                    cache=self.verdict_cache,
+                )
+                for i, flag in zip(pending, found):
+                    flags[i] = flag
+        return flags
+
+    def submit(self, contents, return_spans=False):
+        """Start verifying the snippets of several files and return a :class:`PendingScan`.
+
+        The candidate snippets are sent to detect-secrets at once; with a
+        worker pool the scan runs in the background until :meth:`collect`.
+        Provider secrets are found here as well (see :meth:`find_secrets`).
+        """
+        contents = list(contents)
+        per_file = [self._candidates(content) for content in contents]
+        texts = [span.text for spans in per_file for span in spans]
+        verdicts = None
+        if self.secrets_scanner is not None and texts:
+            verdicts = self.secrets_scanner.submit(texts)
+        provider = [self.find_secrets(content) for content in contents]
+        return PendingScan(per_file, texts, verdicts, return_spans, provider)
+
+    def collect(self, scans):
+        """Wait for submitted scans and return their verified snippets, one list per file.
+
+        The snippets of all scans are checked with a single gitleaks run.
+        Provider secrets not already inside a verified snippet are added after
+        the snippets of their file.
+        """
+        scans = list(scans)
+        texts = [text for scan in scans for text in scan.texts]
+        flags = []
+        for scan in scans:
+            flags.extend(scan.verdicts.result() if scan.verdicts is not None else [True] * len(scan.texts))
+        flags = iter(self._gitleaks_flags(texts, flags))
+        results = []
+        for scan in scans:
+            for spans, provider in zip(scan.per_file, scan.provider):
+                verified = []
+                for span in spans:
+                    if not next(flags):
+                        continue
+                    if not self.filter_placeholders or not self._is_placeholder_span(span):
+                        verified.append(span)
+                for secret in provider:
+                    if not any(s.start <= secret.term_start and secret.term_end <= s.end for s in verified):
+                        verified.append(secret)
+                results.append(verified if scan.return_spans else [span.text for span in verified])
+        return results
+
+    def scan_batch(self, contents, return_spans=False):
+        """Return the verified snippets of several files, one list per file.
+
+        The candidate snippets of all files go to detect-secrets and gitleaks
+        in a single batch each, so pass a whole page of files when either
+        scanner is enabled.
+        """
+        return self.collect([self.submit(contents, return_spans=return_spans)])
+
+    def scan(self, content, return_spans=False):
+        """Return the verified snippets in ``content`` (see :func:`extract_snippets`)."""
+        return self.scan_batch([content], return_spans=return_spans)[0]
+
+
+def extract_snippets(content, query, filter_placeholders=True, allowlist_patterns=None, detector=None,
+                     return_spans=False, wait=True):
     """Extract and verify snippets that triggered a search rule.
 
     Parameters
@@ -752,56 +1565,53 @@ def extract_snippets(content, query, filter_placeholders=True, allowlist_pattern
     allowlist_patterns : list[str] or None, optional
         Patterns that identify allowed or dummy secrets. If a snippet
         matches any of these patterns it will be ignored.
+    detector : SnippetDetector or None, optional
+        Precompiled rules to use instead of building them from the other
+        arguments and ``config.json``. Pass one when scanning many files
+        for the same query.
+    return_spans : bool, optional
+        If True, return :class:`SnippetSpan` records with offsets and line
+        numbers instead of strings.
+    wait : bool, optional
+        If False, return a :class:`PendingScan` as soon as the snippets are
+        submitted to the external scanners. Pass the pending scans of a page
+        to ``detector.collect`` to get the snippets, so verification overlaps
+        with downloading the remaining files.
     """
 
-    query_terms = extract_search_terms(query)
-    snippets = []
-    config = load_config()
-    use_scanner = config.get("USE_DETECT_SECRETS", False)
-    baseline = config.get("DETECT_SECRETS_BASELINE") or None
-    use_gitleaks = config.get("USE_GITLEAKS", False)
-    gitleaks_cfg = config.get("GITLEAKS_CONFIG") or None
-    entropy_threshold = config.get("ENTROPY_THRESHOLD", DEFAULT_ENTROPY_THRESHOLD)
-
-    for term in query_terms:
-        pattern = re.compile(re.escape(term), re.IGNORECASE)
-        for match in pattern.finditer(content):
-            # Capture 40 chars before and 100 after the term for context
-            start = max(match.start() - 40, 0)
-            end = min(match.end() + 100, len(content))
-            snippet = content[start:end].replace('\n', ' ').strip()
-            if snippet not in snippets and not _has_allowlist_comment(content, start, end):
-                snippets.append(snippet)
-
-    verified = []
-    for snippet in snippets:
-        if any(re.search(re.escape(t), snippet, re.IGNORECASE) for t in query_terms):
-            if allowlist_patterns and any(re.search(p, snippet, re.I) for p in allowlist_patterns):
-                continue
-            if use_scanner and not snippet_has_secret(snippet, baseline_file=baseline):
-                continue
-            if use_gitleaks and not gitleaks_has_secret(snippet, config_file=gitleaks_cfg):
-                continue
-            if not filter_placeholders or not _is_placeholder_snippet(
-                snippet,
-                query_terms=query_terms,
-                entropy_threshold=entropy_threshold,
-            ):
-                verified.append(snippet)
-
-    return verified
+    if detector is None:
+        detector = SnippetDetector.from_config(
+            query,
+            filter_placeholders=filter_placeholders,
+            allowlist_patterns=allowlist_patterns or [],
+        )
+    if not wait:
+        return detector.submit([content], return_spans=return_spans)
+    return detector.scan(content, return_spans=return_spans)
 
 
 def find_high_entropy_snippets(content, entropy_threshold=DEFAULT_ENTROPY_THRESHOLD, min_length=20):
     """Return lines containing tokens with entropy above ``entropy_threshold``."""
+    lines = content.splitlines()
+    tokens = []
+    owners = []
+    for index, line in enumerate(lines):
+        for token in line.split():
+            if len(token) >= min_length:
+                tokens.append(token)
+                owners.append(index)
+    if not tokens:
+        return []
+    # Score every candidate token of the file in one batch
+    entropies = _shannon_entropy_batch(tokens)
+    hits = np.unique(np.asarray(owners)[entropies >= entropy_threshold])
     snippets = []
-    for line in content.splitlines():
-        for token in re.findall(r"\S+", line):
-            if len(token) >= min_length and _shannon_entropy(token) >= entropy_threshold:
-                snippet = line.strip()
-                if snippet and snippet not in snippets:
-                    snippets.append(snippet)
-                break
+    seen = set()
+    for index in hits:
+        snippet = lines[index].strip()
+        if snippet and snippet not in seen:
+            seen.add(snippet)
+            snippets.append(snippet)
     return snippets
 
 def save_data_to_excel(data_list, domain):
@@ -878,26 +1688,56 @@ def perform_grouped_searches(domain):
         queries = updated_search_groups[group_name]
         for query in queries:
             print(f"Executing search for: {query}")
-            headers = GitSleuth_API.get_headers()
-            search_results = GitSleuth_API.search_github_code(query, headers)
-            if search_results and 'items' in search_results:
-                process_search_results(
+            # Requests are paced by the rate governor and spread over the
+            # token pool, so no rate limit check is needed before each query
+            headers = GitSleuth_API.get_headers("code_search")
+            pages = ShardedCodeSearch(
+                query, headers, shard=config.get("SHARD_LARGE_QUERIES", True)
+            )
+            tarball_scans = {}
+            handled_items = set()
+            detector = SnippetDetector.from_config(
+                query, config, filter_placeholders=filter_placeholders
+            )
+            run_code_search(
+                pages,
+                lambda search_results: process_search_results(
                     search_results,
                     all_data,
                     query,
-                    headers,
+                    pages.headers,
                     group_name,
                     ignored_filenames,
                     domain,
                     filter_placeholders,
-                )
-            else:
+                    tarball_scans=tarball_scans,
+                    detector=detector,
+                    handled_items=handled_items,
+                ),
+                config,
+            )
+            if not pages.fetched:
                 print(f"No results found for query: {query}")
+            elif pages.truncated:
+                logging.warning(
+                    f"Query '{query}' matched {pages.total_count} files; "
+                    f"only the first {pages.fetched} were processed."
+                )
+            if pages.incomplete_results:
+                logging.warning(f"GitHub returned incomplete results for query '{query}'")
+    logging.info(f"Blob cache statistics: {GitSleuth_API.blob_cache_stats()}")
+    logging.info(f"Value classification cache: {classification_cache_info()}")
+    verdict_cache = verdict_cache_from_config(load_config())
+    if verdict_cache is not None:
+        logging.info(f"Scanner verdict cache statistics: {verdict_cache.stats()}")
 
 def check_and_handle_rate_limit(headers):
     """
     Checks and handles the GitHub API rate limit.
 
+    The quota is read from the rate limit state recorded on earlier
+    responses, so this only contacts the API when the state is unknown.
+
     Parameters:
     headers (dict): Headers including the current GitHub token for API requests.
     """
@@ -917,28 +1757,40 @@ def perform_custom_search(domain):
     custom_query = input("Enter your custom search query: ")
     full_query = f"{custom_query} {domain}"  # Appends the domain to the search query
     config = load_config()
-    headers = GitSleuth_API.get_headers()
+    headers = GitSleuth_API.get_headers("code_search")
     filter_placeholders = config.get("FILTER_PLACEHOLDERS", True)
-    search_results = GitSleuth_API.search_github_code(full_query, headers)
+    pages = ShardedCodeSearch(
+        full_query, headers, shard=config.get("SHARD_LARGE_QUERIES", True)
+    )
+    detector = SnippetDetector.from_config(
+        full_query, config, filter_placeholders=filter_placeholders
+    )
     description = get_query_description(full_query, domain)
     all_data = []
-    if search_results and 'items' in search_results:
-        for item in search_results['items']:
+    handled_items = set()
+
+    def handle_page(search_results):
+        items = [
+            item for item in search_results['items']
+            if (item['repository']['full_name'], item['path']) not in handled_items
+        ]
+        fetched = GitSleuth_API.fetch_file_contents_concurrently(items, pages.headers)
+        # Submitted while the page downloads; gitleaks runs once per page
+        fetched = [
+            (item, contents, detector.submit([contents]) if contents else None)
+            for item, contents in fetched
+        ]
+        page_snippets = iter(detector.collect(scan for _, _, scan in fetched if scan is not None))
+        for item, file_contents, scan in fetched:
             repo_name = item['repository']['full_name']
             file_path = item['path']
-            file_contents = GitSleuth_API.get_file_contents(repo_name, file_path, headers)
+            handled_items.add((repo_name, file_path))
             if file_contents:
-                allowlist = config.get("ALLOWLIST_PATTERNS", [])
-                snippets = extract_snippets(
-                    file_contents,
-                    full_query,
-                    filter_placeholders=config.get("FILTER_PLACEHOLDERS", True),
-                    allowlist_patterns=allowlist,
-                )
+                snippets = next(page_snippets)
                 if not snippets:
                     print(f"No snippets found in {file_path} for query '{full_query}'")
                     continue  # Skip to next item if no snippets are found
-                entropies = [get_secret_entropy(s, query_terms=extract_search_terms(full_query)) for s in snippets]
+                entropies = [get_secret_entropy(s, query_terms=detector.query_terms, rule_pack=detector.rule_pack) for s in snippets]
                 file_data = {
                     'repo': repo_name,
                     'file_path': file_path,
@@ -951,7 +1803,9 @@ def perform_custom_search(domain):
                 process_and_display_data(file_data, full_query, description)
             else:
                 print(f"No file contents found for {file_path}")
-    else:
+
+    run_code_search(pages, handle_page, config)
+    if not pages.fetched:
         print("No results found for your query.")
     save_data_to_excel(all_data, 'custom_search_results.xlsx')
 
@@ -961,14 +1815,21 @@ def perform_entropy_search(domain):
     config = load_config()
     threshold = config.get("ENTROPY_THRESHOLD", DEFAULT_ENTROPY_THRESHOLD)
     query = domain or "a"
-    headers = GitSleuth_API.get_headers()
-    search_results = GitSleuth_API.search_github_code(query, headers)
+    headers = GitSleuth_API.get_headers("code_search")
+    pages = ShardedCodeSearch(query, headers, shard=config.get("SHARD_LARGE_QUERIES", True))
     all_data = []
-    if search_results and 'items' in search_results:
-        for item in search_results['items']:
+    handled_items = set()
+
+    def handle_page(search_results):
+        items = [
+            item for item in search_results['items']
+            if (item['repository']['full_name'], item['path']) not in handled_items
+        ]
+        fetched = GitSleuth_API.fetch_file_contents_concurrently(items, pages.headers)
+        for item, file_contents in fetched:
             repo_name = item['repository']['full_name']
             file_path = item['path']
-            file_contents = GitSleuth_API.get_file_contents(repo_name, file_path, headers)
+            handled_items.add((repo_name, file_path))
             if file_contents:
                 snippets = find_high_entropy_snippets(file_contents, entropy_threshold=threshold)
                 if snippets:
@@ -984,10 +1845,115 @@ def perform_entropy_search(domain):
                     }
                     all_data.append(file_data)
                     process_and_display_data(file_data, 'high_entropy', description)
-    else:
+
+    run_code_search(pages, handle_page, config)
+    if not pages.fetched:
         print("No results found for your query.")
     save_data_to_excel(all_data, 'entropy_search_results')
 
+def scan_local_history(repo_path, query, all_data, filter_placeholders=True, checkpoints=None):
+    """
+    Scans the lines added by each commit of a local or bare repository.
+
+    Diffs are streamed from ``git log -p`` and only added lines are checked.
+    With ``checkpoints`` only commits made since the last completed scan of
+    the repository are visited.
+
+    Parameters:
+    - repo_path (str): Path to the working tree or bare repository.
+    - query (str): Search terms used to extract snippets.
+    - all_data (list): The list to append findings to.
+    - filter_placeholders (bool): Whether to ignore placeholder snippets.
+    - checkpoints (HistoryCheckpoints): Last scanned commit of every ref.
+    """
+    config = load_config()
+    detector = SnippetDetector.from_config(query, config, filter_placeholders=filter_placeholders)
+    changes = iter_new_history(
+        repo_path,
+        checkpoints,
+        git=config.get("GIT_EXECUTABLE", DEFAULT_GIT_EXECUTABLE),
+    )
+    commits = set()
+
+    def files():
+        for commit, file_path, added in changes:
+            commits.add(commit)
+            if not detector.is_ignored_path(file_path):
+                yield (commit, file_path), added
+
+    for (commit, file_path), snippets in scan_contents_batched(files(), detector):
+        if snippets:
+            file_data = {
+                'repo': repo_path,
+                'file_path': file_path,
+                'commit': commit,
+                'snippets': snippets,
+                'entropy_scores': [get_secret_entropy(s, query_terms=detector.query_terms, rule_pack=detector.rule_pack) for s in snippets],
+                'search_term': query,
+                'description': "Commit history scan",
+            }
+            all_data.append(file_data)
+            process_and_display_data(file_data, query, file_data['description'])
+    logging.info(f"Scanned changes from {len(commits)} commits in {repo_path}")
+
+
+def _prompt_local_scan():
+    """Ask for repository paths and search terms for a local scan."""
+    paths = input("Enter local repository paths (comma separated): ")
+    repo_paths = [p.strip() for p in paths.split(',') if p.strip()]
+    if not repo_paths:
+        print("No repository given.")
+        return [], None
+    terms = input("Enter search terms (leave blank for common secret keywords): ").strip()
+    return repo_paths, terms or " ".join(PRECEDING_KEYWORDS)
+
+
+def perform_history_scan():
+    """Scan commits added to local repositories since the last history scan."""
+    repo_paths, query = _prompt_local_scan()
+    if not repo_paths:
+        return
+    config = load_config()
+    checkpoints = HistoryCheckpoints(
+        config.get("HISTORY_CHECKPOINT_FILE", DEFAULT_CHECKPOINT_FILE)
+    )
+    all_data = []
+    for repo_path in repo_paths:
+        print(f"Scanning history of {repo_path}")
+        try:
+            scan_local_history(
+                repo_path,
+                query,
+                all_data,
+                filter_placeholders=config.get("FILTER_PLACEHOLDERS", True),
+                checkpoints=checkpoints,
+            )
+        except (GitError, OSError) as e:
+            print(f"Failed to scan {repo_path}: {e}")
+    save_data_to_excel(all_data, 'history_scan')
+
+def perform_local_scan():
+    """Scan local or mirrored repositories, including their full history."""
+    repo_paths, query = _prompt_local_scan()
+    if not repo_paths:
+        return
+    config = load_config()
+    all_data = []
+    seen_blobs = set()
+    for repo_path in repo_paths:
+        print(f"Scanning {repo_path}")
+        try:
+            scan_local_repository(
+                repo_path,
+                query,
+                all_data,
+                filter_placeholders=config.get("FILTER_PLACEHOLDERS", True),
+                seen_blobs=seen_blobs,
+            )
+        except (GitError, OSError) as e:
+            print(f"Failed to scan {repo_path}: {e}")
+    save_data_to_excel(all_data, 'local_scan')
+
 def main():
     """
     The main function for running the gitsleuth application.
@@ -1002,7 +1968,7 @@ def main():
     try:
         while True:
 
-            print("\n1. OAuth Login\n2. Perform Group Searches\n3. Perform Custom Search\n4. High Entropy Search\n5. Exit")
+            print("\n1. OAuth Login\n2. Perform Group Searches\n3. Perform Custom Search\n4. High Entropy Search\n5. Scan Local Repository\n6. Scan Local Commit History\n7. Exit")
             choice = input("Enter your choice: ")
             if choice == '1':
                 oauth_login_flow()
@@ -1013,10 +1979,14 @@ def main():
             elif choice == '4':
                 perform_entropy_search(domain)
             elif choice == '5':
+                perform_local_scan()
+            elif choice == '6':
+                perform_history_scan()
+            elif choice == '7':
                 print("Exiting the program.")
                 break
             else:
-                print("Invalid choice. Please enter a number from 1 to 5.")
+                print("Invalid choice. Please enter a number from 1 to 7.")
     except KeyboardInterrupt:
         print("\nInterrupted by user. Saving the data collected so far...")
         formatted_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -1,15 +1,46 @@
 #GitSleuth_API
 import base64
+import functools
+import json
 import logging
 import os
+import tarfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from Blob_Cache import BlobCache, DEFAULT_CACHE_DIR
 from OAuth_Manager import oauth_login
-from Token_Manager import load_tokens
+from Rate_Limiter import RateGovernor, DEFAULT_BURST_FRACTION
+from Response_Cache import ResponseCache, DEFAULT_CACHE_DIR as DEFAULT_RESPONSE_CACHE_DIR
+from Token_Manager import TokenPool, load_tokens
 
 
 # Constants for GitHub API
 GITHUB_API_URL = 'https://api.github.com/'
+CONFIG_FILE = 'config.json'
+
+# Defaults for the shared HTTP session. They can be overridden in config.json
+# with HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT and HTTP_READ_TIMEOUT.
+DEFAULT_POOL_SIZE = 20
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+# Maximum number of file downloads in flight per token
+# (MAX_CONCURRENT_FETCHES_PER_TOKEN in config.json).
+DEFAULT_FETCH_CONCURRENCY = 8
+# Files fetched per GraphQL request (GRAPHQL_BATCH_SIZE) and the largest
+# blob taken from GraphQL; bigger or binary blobs fall back to REST.
+DEFAULT_GRAPHQL_BATCH_SIZE = 50
+GRAPHQL_MAX_BLOB_BYTES = 512 * 1024
+# Largest file body read by the raw backend (MAX_FILE_BYTES); anything past
+# the cap is not downloaded. Binary files are detected from their first bytes.
+DEFAULT_MAX_FILE_BYTES = 1024 * 1024
+BINARY_SNIFF_BYTES = 8192
+RAW_CHUNK_SIZE = 64 * 1024
+RAW_MEDIA_TYPE = 'application/vnd.github.raw+json'
+# Wait used when a rate limited response does not say when the limit resets
+DEFAULT_RATE_LIMIT_WAIT = 60
 class RateLimitException(Exception):
     def __init__(self, message, wait_time=None):
         super().__init__(message)
@@ -17,10 +48,254 @@ class RateLimitException(Exception):
 
 
 
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_TIMEOUT = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+_TOKEN_SEMAPHORES = {}
+_BLOB_CACHE = None
+_RESPONSE_CACHE = None
+_RATE_GOVERNOR = None
+_WAIT_FUNCTION = time.sleep
+
+
+@functools.lru_cache(maxsize=1)
+def _read_api_config(path, mtime_ns) -> dict:
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _load_api_config() -> dict:
+    """Return settings from ``config.json`` or an empty dict.
+
+    The parsed file is reused until its modification time changes, so
+    per-request lookups cost a ``stat`` rather than a read and parse.
+    Callers must not modify the returned dict.
+    """
+    try:
+        mtime_ns = os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return {}
+    return _read_api_config(CONFIG_FILE, mtime_ns)
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE):
+    """Create a keep-alive session with a connection pool of ``pool_size``.
+
+    The same pool is mounted for ``https://`` and ``http://`` so every API
+    call reuses established TLS connections instead of opening a new one.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+def get_session():
+    """Return the shared HTTP session, creating it on first use."""
+    global _SESSION, _TIMEOUT
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                cfg = _load_api_config()
+                _TIMEOUT = (
+                    float(cfg.get('HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
+                    float(cfg.get('HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)),
+                )
+                _SESSION = create_session(int(cfg.get('HTTP_POOL_SIZE', DEFAULT_POOL_SIZE)))
+    return _SESSION
+
+
+def close_session():
+    """Close the shared session and release pooled connections."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
+
+
+def get_blob_cache():
+    """Return the shared blob cache, or None when ``USE_BLOB_CACHE`` is off."""
+    global _BLOB_CACHE
+    if _BLOB_CACHE is None:
+        cfg = _load_api_config()
+        if not cfg.get('USE_BLOB_CACHE', True):
+            return None
+        with _SESSION_LOCK:
+            if _BLOB_CACHE is None:
+                _BLOB_CACHE = BlobCache(
+                    cfg.get('BLOB_CACHE_DIR') or DEFAULT_CACHE_DIR,
+                    int(float(cfg.get('BLOB_CACHE_MAX_MB', 256)) * 1024 * 1024),
+                )
+    return _BLOB_CACHE
+
+
+def blob_cache_stats():
+    """Return hit/miss statistics of the blob cache (empty if disabled)."""
+    cache = get_blob_cache()
+    return cache.stats() if cache else {}
+
+
+def get_response_cache():
+    """Return the conditional request cache, or None when ``USE_RESPONSE_CACHE`` is off."""
+    global _RESPONSE_CACHE
+    if _RESPONSE_CACHE is None:
+        cfg = _load_api_config()
+        if not cfg.get('USE_RESPONSE_CACHE', True):
+            return None
+        with _SESSION_LOCK:
+            if _RESPONSE_CACHE is None:
+                _RESPONSE_CACHE = ResponseCache(
+                    cfg.get('RESPONSE_CACHE_DIR') or DEFAULT_RESPONSE_CACHE_DIR
+                )
+    return _RESPONSE_CACHE
+
+
+def get_rate_governor():
+    """Return the request pacer, or None when ``USE_RATE_GOVERNOR`` is off."""
+    global _RATE_GOVERNOR
+    if _RATE_GOVERNOR is None:
+        cfg = _load_api_config()
+        if not cfg.get('USE_RATE_GOVERNOR', True):
+            return None
+        with _SESSION_LOCK:
+            if _RATE_GOVERNOR is None:
+                _RATE_GOVERNOR = RateGovernor(
+                    float(cfg.get('RATE_LIMIT_BURST_FRACTION', DEFAULT_BURST_FRACTION))
+                )
+    return _RATE_GOVERNOR
+
+
+def set_wait_function(wait):
+    """
+    Sets the function used to wait for the rate governor on the main thread.
+
+    The GUI installs a wait that keeps processing events; worker threads
+    always use ``time.sleep``.
+    """
+    global _WAIT_FUNCTION
+    _WAIT_FUNCTION = wait or time.sleep
+
+
+def _rate_limit_resource(url):
+    """Return the rate limit resource a request to ``url`` counts against.
+
+    The names match the ``X-RateLimit-Resource`` header GitHub sends, so
+    pacing and quota tracking use the same key for a request and its
+    response. Code search has its own, smaller quota (``code_search``).
+    """
+    if '/search/code' in url:
+        return 'code_search'
+    if '/search/' in url:
+        return 'search'
+    if url.rstrip('/').endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+def _rate_limit_wait(response):
+    """Return the seconds to wait after ``response`` hit a rate limit."""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    reset = response.headers.get('X-RateLimit-Reset')
+    if reset and reset.isdigit():
+        return max(int(reset) - int(time.time()), 0)
+    return DEFAULT_RATE_LIMIT_WAIT
+
+
+def _is_secondary_rate_limit(response):
+    return response.status_code in (403, 429) and (
+        'secondary rate limit' in response.text.lower()
+        or 'Retry-After' in response.headers
+    )
+
+
+def _pace_request(url, headers):
+    """Wait until the rate governor allows a request with ``headers``."""
+    governor = get_rate_governor()
+    token = _token_from_headers(headers)
+    if not governor or not token:
+        return
+    delay = governor.reserve(token, _rate_limit_resource(url))
+    if delay > 0:
+        logging.info(f"Pacing requests to stay within the rate limit: waiting {delay:.1f}s")
+        if threading.current_thread() is threading.main_thread():
+            _WAIT_FUNCTION(delay)
+        else:
+            time.sleep(delay)
+
+
+def api_get(url, headers=None, conditional=True, **kwargs):
+    """
+    Sends a GET request through the shared session.
+
+    When ``conditional`` is True and an earlier response for the same URL
+    was cached, ``If-None-Match``/``If-Modified-Since`` headers are added so
+    GitHub can answer with ``304 Not Modified``. The cache key is attached
+    to the response as ``cache_key`` for :func:`handle_api_response`.
+
+    Parameters:
+    - url (str): The URL to request.
+    - headers (dict): Headers for the request.
+    - conditional (bool): Whether to revalidate against the response cache.
+    - **kwargs: Extra arguments passed to ``requests.Session.get``.
+
+    Returns:
+    - requests.Response: The response object.
+    """
+    session = get_session()
+    kwargs.setdefault('timeout', _TIMEOUT)
+    cache = get_response_cache() if conditional else None
+    key = None
+    if cache:
+        cache_url = url
+        if kwargs.get('params'):
+            cache_url = requests.Request('GET', url, params=kwargs['params']).prepare().url
+        key = ResponseCache.make_key('GET', cache_url, headers)
+        validators = cache.validators(key)
+        if validators:
+            headers = {**(headers or {}), **validators}
+    _pace_request(url, headers)
+    response = session.get(url, headers=headers, **kwargs)
+    response.cache_key = key
+    _record_rate_limit(response)
+    return response
+
+
+def api_post(url, headers=None, **kwargs):
+    """
+    Sends a POST request through the shared session.
+
+    Parameters:
+    - url (str): The URL to request.
+    - headers (dict): Headers for the request.
+    - **kwargs: Extra arguments passed to ``requests.Session.post``.
+
+    Returns:
+    - requests.Response: The response object.
+    """
+    session = get_session()
+    kwargs.setdefault('timeout', _TIMEOUT)
+    _pace_request(url, headers)
+    response = session.post(url, headers=headers, **kwargs)
+    _record_rate_limit(response)
+    return response
+
+
 def handle_api_response(response):
     """
     Handles the API response, checking for errors, logging, and returning the response JSON.
-    Logs the full response for debugging purposes.
+    Logs the full response for debugging purposes. A ``304 Not Modified``
+    answer to a conditional request is served from the response cache.
 
     Parameters:
     - response (requests.Response): The response object from the API request.
@@ -29,6 +304,16 @@ def handle_api_response(response):
     - dict or None: Parsed JSON data from the response, or None if an error occurred.
     """
 
+    cache = get_response_cache()
+    cache_key = getattr(response, 'cache_key', None)
+    if response.status_code == 304:
+        cached = cache.lookup(cache_key) if cache and cache_key else None
+        if cached is None:
+            logging.error("Received 304 Not Modified without a cached response")
+        else:
+            logging.debug(f"Serving cached response for {response.url} (304 Not Modified)")
+        return cached
+
     # Log the full response for debugging
     try:
         response_json = response.json()
@@ -38,38 +323,118 @@ def handle_api_response(response):
         return None
 
     if response.status_code == 200:
+        if cache and cache_key:
+            cache.store(cache_key, response.headers, response_json)
         return response_json
     elif response.status_code in (403, 429) and (
         'rate limit' in response.text.lower()
         or 'Retry-After' in response.headers
     ):
-        reset = response.headers.get('X-RateLimit-Reset')
-        retry_after = response.headers.get('Retry-After')
-        if retry_after:
-            wait_time = int(retry_after)
-        else:
-            wait_time = max(int(reset) - int(time.time()), 0) if reset else None
-        raise RateLimitException("GitHub API rate limit reached", wait_time)
+        raise RateLimitException("GitHub API rate limit reached", _rate_limit_wait(response))
     else:
         logging.error(f"API request failed with status code {response.status_code}: {response.text}")
         return None
 
 
 def fetch_paginated_data(url, headers, max_items=100):
+    """
+    Collects items from a paginated endpoint by following ``Link`` headers.
+
+    Search endpoints wrap their results in an ``items`` list, which is
+    unwrapped transparently. Rate limit errors are raised as
+    :class:`RateLimitException` like the other API helpers.
+
+    Parameters:
+    - url (str): URL of the first page.
+    - headers (dict): Headers for the GitHub API request.
+    - max_items (int): Maximum number of items to return.
+
+    Returns:
+    - list: The collected items.
+    """
     items = []
     while url and len(items) < max_items:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            page_data = response.json()
-            items.extend(page_data)
-            url = response.links.get('next', {}).get('url', None)
-        else:
-            logging.error(f"Failed to fetch paginated data: {response.text}")
+        response = api_get(url, headers=headers)
+        page_data = handle_api_response(response)
+        if page_data is None:
+            logging.error(f"Failed to fetch paginated data from {url}")
+            break
+        if isinstance(page_data, dict):
+            page_data = page_data.get('items', [])
+        if not page_data:
             break
+        items.extend(page_data)
+        url = response.links.get('next', {}).get('url', None)
     return items[:max_items]
 
 
-_OAUTH_TOKEN = None
+# GitHub code search never returns more than this many results per query
+CODE_SEARCH_RESULT_CAP = 1000
+
+
+class CodeSearchPaginator:
+    """
+    Lazily iterates over the result pages of a code search query.
+
+    Pages are requested one at a time by following the ``Link`` header, up
+    to GitHub's 1000-result ceiling. ``total_count`` and
+    ``incomplete_results`` are filled in from the first page. A page only
+    counts as done once the consumer asks for the next one, so if a
+    :class:`RateLimitException` interrupts the iteration, either while a
+    page is requested or while it is processed, iterating again resumes
+    from that page; ``headers`` may be replaced in between, for example
+    after switching tokens.
+    """
+
+    def __init__(self, query, headers, per_page=100, max_results=CODE_SEARCH_RESULT_CAP):
+        self.query = query
+        self.headers = headers
+        self.per_page = per_page
+        self.max_results = min(max_results, CODE_SEARCH_RESULT_CAP)
+        self.total_count = None
+        self.incomplete_results = False
+        self.fetched = 0
+        self.page = 1
+        self.next_url = self._page_url(1)
+
+    def _page_url(self, page):
+        return f"{GITHUB_API_URL}search/code?q={self.query}&per_page={self.per_page}&page={page}"
+
+    @property
+    def truncated(self):
+        """True when GitHub reports more matches than can be paginated."""
+        return bool(self.total_count and self.total_count > CODE_SEARCH_RESULT_CAP)
+
+    def __iter__(self):
+        while self.next_url and self.fetched < self.max_results:
+            headers = with_pool_token(self.headers, 'code_search')
+            response = api_get(self.next_url, headers=headers)
+            page_data = handle_api_response(response)
+            if not page_data or 'items' not in page_data:
+                self.next_url = None
+                return
+            self.total_count = page_data.get('total_count', self.total_count)
+            self.incomplete_results = (
+                self.incomplete_results or bool(page_data.get('incomplete_results'))
+            )
+            items = page_data['items'][: self.max_results - self.fetched]
+            next_url = response.links.get('next', {}).get('url')
+            if not next_url and response.status_code == 304:
+                # Cached pages may come back without a Link header
+                if len(items) == self.per_page and self.fetched + len(items) < (self.total_count or 0):
+                    next_url = self._page_url(self.page + 1)
+            if not items:
+                self.next_url = None
+                return
+            page_data['items'] = items
+            yield page_data
+            # Advance only after the consumer has finished with the page
+            self.fetched += len(items)
+            self.page += 1
+            self.next_url = next_url
+
+
+_TOKEN_POOL = None
 
 
 def _choose_token(tokens: dict) -> str | None:
@@ -82,34 +447,103 @@ def _choose_token(tokens: dict) -> str | None:
     return None
 
 
-def get_headers():
-    """Generate headers for GitHub API requests."""
+def get_token_pool():
+    """
+    Returns the shared pool of GitHub tokens.
 
-    global _OAUTH_TOKEN
-    if not _OAUTH_TOKEN:
-        _OAUTH_TOKEN = os.environ.get("GITHUB_OAUTH_TOKEN")
-        if not _OAUTH_TOKEN:
-            tokens = load_tokens()
-            _OAUTH_TOKEN = _choose_token(tokens)
+    The pool holds the token in ``GITHUB_OAUTH_TOKEN`` followed by the
+    preferred stored token and any other saved tokens. A token placed in the
+    environment later (e.g. after an OAuth login) is added on the next call.
+    """
+    global _TOKEN_POOL
+    with _SESSION_LOCK:
+        if _TOKEN_POOL is None:
+            stored = load_tokens()
+            preferred = _choose_token(stored)
+            _TOKEN_POOL = TokenPool(
+                [os.environ.get("GITHUB_OAUTH_TOKEN"), preferred, *stored.values()]
+            )
+    env_token = os.environ.get("GITHUB_OAUTH_TOKEN")
+    if env_token:
+        _TOKEN_POOL.add(env_token)
+    return _TOKEN_POOL
 
-        if not _OAUTH_TOKEN:
-            result = oauth_login()
-            _OAUTH_TOKEN = result[0] if isinstance(result, tuple) else result
 
-        if not _OAUTH_TOKEN:
-            logging.error("No GitHub tokens available.")
-            return {}
+def reset_token_pool():
+    """Forget the token pool so it is rebuilt from the stored tokens."""
+    global _TOKEN_POOL
+    with _SESSION_LOCK:
+        _TOKEN_POOL = None
 
-        os.environ["GITHUB_OAUTH_TOKEN"] = _OAUTH_TOKEN
 
-    logging.debug("Using OAuth token")
+def _build_headers(token):
     return {
-        "Authorization": f"token {_OAUTH_TOKEN}",
+        "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
         "X-GitHub-Api-Version": "2022-11-28",
 
     }
 
+
+def _token_from_headers(headers):
+    """Return the token in an ``Authorization`` header, if any."""
+    auth = (headers or {}).get("Authorization", "")
+    return auth.split(" ", 1)[1] if " " in auth else None
+
+
+def get_headers(resource="core"):
+    """
+    Generate headers for GitHub API requests.
+
+    The token with the most remaining quota for ``resource`` (``core`` or
+    ``code_search``) is chosen from the token pool. The OAuth device flow is
+    started only when no token is available at all.
+    """
+    pool = get_token_pool()
+    if not pool.tokens:
+        result = oauth_login()
+        token = result[0] if isinstance(result, tuple) else result
+        if not token:
+            logging.error("No GitHub tokens available.")
+            return {}
+        os.environ["GITHUB_OAUTH_TOKEN"] = token
+        pool.add(token)
+
+    token = pool.acquire(resource)
+    logging.debug("Using OAuth token")
+    return _build_headers(token)
+
+
+def with_pool_token(headers, resource="core"):
+    """
+    Returns ``headers`` using the pooled token with the most headroom.
+
+    Requests issued with the same headers are spread over every token in
+    the pool, so N tokens give roughly N times the request budget. The
+    headers are returned unchanged when the pool has a single token.
+    """
+    pool = get_token_pool()
+    if len(pool.tokens) < 2 or not _token_from_headers(headers):
+        return headers
+    return {**headers, "Authorization": f"token {pool.acquire(resource)}"}
+
+
+def _record_rate_limit(response):
+    """Record the rate limit headers of ``response`` in the token pool and governor."""
+    token = _token_from_headers(response.request.headers)
+    if not token:
+        return
+    if 'X-RateLimit-Remaining' in response.headers:
+        get_token_pool().update_from_headers(token, response.headers)
+    governor = get_rate_governor()
+    if governor:
+        governor.observe(
+            token,
+            _rate_limit_resource(response.url),
+            response.headers,
+            secondary_limit=_is_secondary_rate_limit(response),
+        )
+
     
 def get_repo_info(repo_name, headers):
     """
@@ -123,7 +557,7 @@ def get_repo_info(repo_name, headers):
     - dict: Repository information if successful, None otherwise.
     """
     repo_url = f'{GITHUB_API_URL}repos/{repo_name}'
-    response = requests.get(repo_url, headers=headers)
+    response = api_get(repo_url, headers=headers)
     return handle_api_response(response)
 
 def get_commit_history(repo_name, headers, max_commits=100):
@@ -155,25 +589,353 @@ def search_github_for_repos(query, headers, max_repos=100):
     """
     search_url = f"{GITHUB_API_URL}search/repositories?q={query}&sort=updated&order=desc"
     return fetch_paginated_data(search_url, headers, max_repos)
-def get_file_contents(repo_name, file_path, headers):
+def _max_file_bytes() -> int:
+    """Return the configured cap for raw file downloads in bytes."""
+    try:
+        return max(1, int(_load_api_config().get('MAX_FILE_BYTES', DEFAULT_MAX_FILE_BYTES)))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_FILE_BYTES
+
+
+def _decode_blob(data):
+    """Return ``data`` decoded as UTF-8, or None when it looks binary.
+
+    Undecodable bytes are replaced instead of raising, so files in other
+    encodings can still be scanned.
+    """
+    if data is None or b'\0' in data[:BINARY_SNIFF_BYTES]:
+        return None
+    return data.decode('utf-8', errors='replace')
+
+
+def fetch_raw_blob(repo_name, file_path, headers, sha=None, max_bytes=None):
+    """
+    Streams a file with the raw media type instead of base64 JSON.
+
+    With a blob ``sha`` the Git Blobs API is used, otherwise the contents
+    API. At most ``max_bytes`` are read and the download stops as soon as a
+    NUL byte shows up in the first ``BINARY_SNIFF_BYTES``.
+
+    Parameters:
+    - repo_name (str): Full name of the repository (username/repo).
+    - file_path (str): Path to the file in the repository.
+    - headers (dict): Headers for the GitHub API request.
+    - sha (str): Git blob SHA of the file, if known.
+    - max_bytes (int): Maximum number of bytes to read. Defaults to ``MAX_FILE_BYTES``.
+
+    Returns:
+    - tuple: ``(data, truncated)``, or None if the request failed or the
+      file is binary.
+    """
+    if max_bytes is None:
+        max_bytes = _max_file_bytes()
+    if sha:
+        url = f"{GITHUB_API_URL}repos/{repo_name}/git/blobs/{sha}"
+    else:
+        url = f"{GITHUB_API_URL}repos/{repo_name}/contents/{file_path}"
+    raw_headers = {**(headers or {}), 'Accept': RAW_MEDIA_TYPE}
+    response = api_get(url, headers=raw_headers, conditional=False, stream=True)
+    try:
+        if response.status_code != 200:
+            handle_api_response(response)
+            return None
+        chunks = []
+        size = 0
+        truncated = False
+        for chunk in response.iter_content(RAW_CHUNK_SIZE):
+            if size < BINARY_SNIFF_BYTES and b'\0' in chunk[:BINARY_SNIFF_BYTES - size]:
+                logging.debug(f"Skipping binary file {repo_name}/{file_path}")
+                return None
+            if size + len(chunk) > max_bytes:
+                chunks.append(chunk[:max_bytes - size])
+                size = max_bytes
+                truncated = True
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+    finally:
+        response.close()
+    if truncated:
+        logging.info(f"Read only the first {max_bytes} bytes of {repo_name}/{file_path}")
+    return b''.join(chunks), truncated
+
+
+def _get_file_contents_raw(repo_name, file_path, headers, sha=None):
+    """Fetch a file through :func:`fetch_raw_blob` and cache complete blobs."""
+    result = fetch_raw_blob(repo_name, file_path, headers, sha=sha)
+    if result is None:
+        return None
+    data, truncated = result
+    cache = get_blob_cache()
+    if cache and sha and not truncated:
+        cache.put(sha, data)
+    return _decode_blob(data)
+
+
+def get_file_contents(repo_name, file_path, headers, sha=None, raw=None):
     """
     Fetches the content of a specific file in a repository.
 
+    When the blob ``sha`` is known (code search items carry it) the blob
+    cache is consulted first and the API is only used on a miss. With
+    ``CONTENT_BACKEND`` set to ``raw`` the file is streamed through
+    :func:`fetch_raw_blob`; the JSON contents API falls back to it for files
+    over 1 MB, which it does not return inline.
+
     Parameters:
     - repo_name (str): Full name of the repository (username/repo).
     - file_path (str): Path to the file in the repository.
     - headers (dict): Headers for the GitHub API request.
+    - sha (str): Git blob SHA of the file, if known.
+    - raw (bool): Force or disable the raw fetch path. Defaults to the configured backend.
 
     Returns:
-    - str: Content of the file, or None if an error occurs.
+    - str: Content of the file, or None if an error occurs or the file is binary.
     """
+    cache = get_blob_cache()
+    if cache and sha:
+        data = cache.get(sha)
+        if data is not None:
+            return _decode_blob(data)
+    if raw is None:
+        raw = _content_backend() == 'raw'
+    if raw:
+        return _get_file_contents_raw(repo_name, file_path, headers, sha=sha)
     file_url = f"{GITHUB_API_URL}repos/{repo_name}/contents/{file_path}"
-    response = requests.get(file_url, headers=headers)
+    # File bodies are cached by blob SHA, so skip the response cache here
+    response = api_get(file_url, headers=headers, conditional=False)
     file_data = handle_api_response(response)
-    if file_data and 'content' in file_data:
-        return base64.b64decode(file_data['content']).decode('utf-8')
-    else:
+    if not isinstance(file_data, dict) or 'content' not in file_data:
         return None
+    if file_data.get('encoding') == 'none':
+        # Files over 1 MB come back without inline content
+        return _get_file_contents_raw(repo_name, file_path, headers, sha=file_data.get('sha') or sha)
+    data = base64.b64decode(file_data['content'])
+    if cache:
+        cache.put(file_data.get('sha') or sha, data)
+    return _decode_blob(data)
+
+def iter_repo_tarball(repo_name, headers, ref=None, max_bytes=None):
+    """
+    Streams a repository tarball and yields its text files.
+
+    The archive is read straight from the response through ``tarfile`` in
+    stream mode, so nothing is written to disk and only one member is held
+    in memory at a time. Members larger than ``max_bytes`` are cut off and
+    binary members are skipped.
+
+    Parameters:
+    - repo_name (str): Full name of the repository (username/repo).
+    - headers (dict): Headers for the GitHub API request.
+    - ref (str): Branch, tag or commit to download. Defaults to the default branch.
+    - max_bytes (int): Maximum bytes read per member. Defaults to ``MAX_FILE_BYTES``.
+
+    Yields:
+    - tuple: ``(file_path, contents)`` with paths relative to the repository root.
+
+    Raises:
+    - RateLimitException: If the rate limit was hit.
+    - requests.RequestException: If the download failed.
+    - tarfile.TarError: If the archive could not be read.
+    """
+    if max_bytes is None:
+        max_bytes = _max_file_bytes()
+    url = f"{GITHUB_API_URL}repos/{repo_name}/tarball"
+    if ref:
+        url = f"{url}/{ref}"
+    response = api_get(url, headers=headers, conditional=False, stream=True)
+    try:
+        if response.status_code != 200:
+            handle_api_response(response)
+            raise requests.HTTPError(f"Tarball download failed with status {response.status_code}", response=response)
+        with tarfile.open(fileobj=response.raw, mode='r|gz') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                # Members are prefixed with an "<owner>-<repo>-<sha>/" directory
+                file_path = member.name.split('/', 1)[-1]
+                handle = archive.extractfile(member)
+                if handle is None:
+                    continue
+                contents = _decode_blob(handle.read(max_bytes))
+                if contents:
+                    yield file_path, contents
+    finally:
+        response.close()
+
+
+def _fetch_concurrency() -> int:
+    """Return the configured per-token download concurrency."""
+    cfg = _load_api_config()
+    return max(1, int(cfg.get('MAX_CONCURRENT_FETCHES_PER_TOKEN', DEFAULT_FETCH_CONCURRENCY)))
+
+
+def _token_semaphore(headers):
+    """Return the semaphore limiting concurrent downloads for a token."""
+    key = (headers or {}).get('Authorization', '')
+    with _SESSION_LOCK:
+        semaphore = _TOKEN_SEMAPHORES.get(key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(_fetch_concurrency())
+            _TOKEN_SEMAPHORES[key] = semaphore
+    return semaphore
+
+
+def _content_backend() -> str:
+    """Return the configured backend for file downloads (``rest``, ``raw`` or ``graphql``)."""
+    return str(_load_api_config().get('CONTENT_BACKEND', 'rest')).lower()
+
+
+def fetch_blobs_graphql(items, headers):
+    """
+    Fetches the files of several code search items with one GraphQL request.
+
+    Every item becomes an aliased ``repository { object(expression:
+    "HEAD:<path>") }`` lookup. Blobs already in the blob cache are not
+    requested.
+
+    Parameters:
+    - items (list): Code search result items.
+    - headers (dict): Headers for the GitHub API request.
+
+    Returns:
+    - list: File contents in the order of ``items``. An entry is None when
+      the blob is missing, binary, truncated or larger than
+      ``GRAPHQL_MAX_BLOB_BYTES`` and has to be fetched over REST instead.
+    """
+    cache = get_blob_cache()
+    results = [None] * len(items)
+    pending = []
+    for index, item in enumerate(items):
+        data = cache.get(item['sha']) if cache and item.get('sha') else None
+        if data is not None:
+            results[index] = _decode_blob(data)
+        else:
+            pending.append(index)
+    if not pending:
+        return results
+
+    declarations = []
+    selections = []
+    variables = {}
+    for index in pending:
+        item = items[index]
+        owner, name = item['repository']['full_name'].split('/', 1)
+        declarations.append(f"$o{index}: String!, $n{index}: String!, $e{index}: String!")
+        selections.append(
+            f"f{index}: repository(owner: $o{index}, name: $n{index}) {{ "
+            f"object(expression: $e{index}) {{ ... on Blob {{ oid byteSize isBinary isTruncated text }} }} }}"
+        )
+        variables[f"o{index}"] = owner
+        variables[f"n{index}"] = name
+        variables[f"e{index}"] = f"HEAD:{item.get('path', '')}"
+    query = f"query({', '.join(declarations)}) {{ {' '.join(selections)} }}"
+
+    response = api_post(
+        f"{GITHUB_API_URL}graphql",
+        headers=headers,
+        json={'query': query, 'variables': variables},
+    )
+    payload = handle_api_response(response)
+    if not payload:
+        return results
+    errors = payload.get('errors') or []
+    if any(error.get('type') == 'RATE_LIMITED' for error in errors):
+        raise RateLimitException("GitHub GraphQL rate limit reached", _rate_limit_wait(response))
+    for error in errors:
+        logging.debug(f"GraphQL error: {error.get('message')}")
+
+    data = payload.get('data') or {}
+    for index in pending:
+        blob = (data.get(f"f{index}") or {}).get('object')
+        if (
+            not blob
+            or blob.get('isBinary')
+            or blob.get('isTruncated')
+            or blob.get('text') is None
+            or (blob.get('byteSize') or 0) > GRAPHQL_MAX_BLOB_BYTES
+        ):
+            continue
+        results[index] = blob['text']
+        if cache:
+            cache.put(blob.get('oid'), blob['text'].encode('utf-8'))
+    return results
+
+
+def _fetch_batch_rest(batch, headers, raw=None):
+    """Download each item of ``batch`` through the REST API."""
+    headers = with_pool_token(headers, 'core')
+    with _token_semaphore(headers):
+        return [
+            get_file_contents(
+                item['repository']['full_name'],
+                item.get('path', ''),
+                headers,
+                sha=item.get('sha'),
+                raw=raw,
+            )
+            for item in batch
+        ]
+
+
+def _fetch_batch_graphql(batch, headers):
+    """Download ``batch`` through GraphQL, falling back to raw REST per file."""
+    graphql_headers = with_pool_token(headers, 'graphql')
+    with _token_semaphore(graphql_headers):
+        results = fetch_blobs_graphql(batch, graphql_headers)
+    for index, contents in enumerate(results):
+        if contents is None:
+            # Binary or oversized blobs: stream them with the byte cap
+            results[index] = _fetch_batch_rest([batch[index]], headers, raw=True)[0]
+    return results
+
+
+def fetch_file_contents_concurrently(items, headers, max_workers=None):
+    """
+    Downloads the files for a page of code search items in parallel.
+
+    Downloads run on a thread pool while results are yielded in the order of
+    ``items``, so callers can process the first file while later ones are
+    still in flight. The number of downloads per token is capped by
+    ``MAX_CONCURRENT_FETCHES_PER_TOKEN``. With ``CONTENT_BACKEND`` set to
+    ``graphql`` the files are fetched in batches of ``GRAPHQL_BATCH_SIZE``
+    per request.
+
+    Parameters:
+    - items (list): Code search result items.
+    - headers (dict): Headers for the GitHub API request.
+    - max_workers (int): Size of the thread pool. Defaults to the per-token cap.
+
+    Yields:
+    - tuple: ``(item, contents)`` where contents is None if the download failed.
+    """
+    items = list(items)
+    if not items:
+        return
+    # Resolved once for the whole page rather than per file
+    backend = _content_backend()
+    if backend == 'graphql':
+        size = max(1, int(_load_api_config().get('GRAPHQL_BATCH_SIZE', DEFAULT_GRAPHQL_BATCH_SIZE)))
+        batches = [items[i:i + size] for i in range(0, len(items), size)]
+        task = _fetch_batch_graphql
+    else:
+        batches = [[item] for item in items]
+        task = functools.partial(_fetch_batch_rest, raw=backend == 'raw')
+    workers = min(max_workers or _fetch_concurrency(), len(batches))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(task, batch, headers) for batch in batches]
+        try:
+            for batch, future in zip(batches, futures):
+                try:
+                    results = future.result()
+                except requests.RequestException as e:
+                    logging.error(f"Failed to fetch file contents: {e}")
+                    results = [None] * len(batch)
+                yield from zip(batch, results)
+        finally:
+            for future in futures:
+                future.cancel()
+
 
 def search_files_in_repo(repo_name, query, headers):
     """
@@ -188,7 +950,7 @@ def search_files_in_repo(repo_name, query, headers):
     - list: List of files matching the query.
     """
     search_url = f"{GITHUB_API_URL}search/code?q=repo:{repo_name}+{query}"
-    response = requests.get(search_url, headers=headers)
+    response = api_get(search_url, headers=headers)
     return handle_api_response(response)
 
 def get_readme_contents(repo_name, headers):
@@ -203,10 +965,10 @@ def get_readme_contents(repo_name, headers):
     - str: README content if successful, None otherwise.
     """
     readme_url = f'{GITHUB_API_URL}repos/{repo_name}/readme'
-    response = requests.get(readme_url, headers=headers)
+    response = api_get(readme_url, headers=headers)
     readme_data = handle_api_response(response)
     if readme_data:
-        return base64.b64decode(readme_data['content']).decode('utf-8')
+        return _decode_blob(base64.b64decode(readme_data['content']))
     else:
         return None
 
@@ -214,6 +976,9 @@ def search_github_code(query, headers):
     """
     Searches for code snippets on GitHub based on a query.
 
+    Only the first page of up to 100 results is returned; use
+    :class:`CodeSearchPaginator` to walk all pages.
+
     Parameters:
     - query (str): The search query.
     - headers (dict): Headers for the GitHub API request.
@@ -222,22 +987,61 @@ def search_github_code(query, headers):
     - list: A list of code search results.
     """
     search_url = f"{GITHUB_API_URL}search/code?q={query}&per_page=100"
-    response = requests.get(search_url, headers=headers)
+    response = api_get(search_url, headers=headers)
     return handle_api_response(response)
 
-def check_rate_limit(headers):
-    """Return remaining search requests and wait time until reset."""
-    rate_limit_url = f"{GITHUB_API_URL}rate_limit"
-    response = requests.get(rate_limit_url, headers=headers)
-    rate_limit_data = handle_api_response(response)
-    if rate_limit_data:
-        search_limit = rate_limit_data['resources']['search']
-        remaining = search_limit['remaining']
-        reset = search_limit.get('reset')
-        wait_time = max(int(reset) - int(time.time()), 0) if reset else None
-        logging.debug(
-            f"Search API rate limit remaining: {remaining}, resets in {wait_time}s"
-        )
-        return remaining, wait_time
-    return 0, None
+def count_code_search_results(query, headers):
+    """
+    Returns the number of files matching a code search query.
+
+    Parameters:
+    - query (str): The search query.
+    - headers (dict): Headers for the GitHub API request.
+
+    Returns:
+    - int or None: ``total_count`` reported by GitHub, or None if the search
+      failed (so a failure is not mistaken for no matches).
+    """
+    search_url = f"{GITHUB_API_URL}search/code?q={query}&per_page=1"
+    response = api_get(search_url, headers=with_pool_token(headers, 'code_search'))
+    search_data = handle_api_response(response)
+    if not search_data or 'total_count' not in search_data:
+        return None
+    return search_data['total_count']
 
+def check_rate_limit(headers, resource='code_search'):
+    """
+    Return remaining requests and wait time until reset for ``resource``.
+
+    The quota recorded from the ``X-RateLimit-*`` headers of earlier
+    responses is used when it is known, so this usually costs no request.
+    The ``/rate_limit`` endpoint is only polled when the state is unknown,
+    and its answer seeds the state for every resource.
+    """
+    pool = get_token_pool()
+    token = _token_from_headers(headers)
+    quota = pool.quota(token, resource) if token else None
+    if quota is None:
+        rate_limit_url = f"{GITHUB_API_URL}rate_limit"
+        response = api_get(rate_limit_url, headers=headers, conditional=False)
+        rate_limit_data = handle_api_response(response)
+        if not rate_limit_data:
+            return 0, None
+        resources = rate_limit_data.get('resources', {})
+        if resource == 'code_search' and resource not in resources:
+            # Servers without a separate code search quota count it as search
+            resource = 'search'
+        if token:
+            pool.update_from_rate_limit(token, rate_limit_data)
+            quota = pool.quota(token, resource)
+        elif resource in resources:
+            limit = resources[resource]
+            quota = (limit['remaining'], limit.get('reset'))
+    if quota is None:
+        return 0, None
+    remaining, reset = quota
+    wait_time = max(int(reset) - int(time.time()), 0) if reset else None
+    logging.debug(
+        f"{resource.capitalize()} API rate limit remaining: {remaining}, resets in {wait_time}s"
+    )
+    return remaining, wait_time
@@ -6,6 +6,7 @@ import csv
 import time
 import logging
 import re
+import tarfile
 from typing import Optional
 
 from PyQt5.QtWidgets import (
@@ -46,6 +47,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import numpy as np
 from scipy.sparse import hstack, csr_matrix
+import requests
 
 
 import GitSleuth_API
@@ -57,15 +59,22 @@ from GitSleuth_Groups import (
 from GitSleuth import (
     extract_snippets,
     switch_token,
-    _path_is_ignored,
+    SnippetDetector,
     _shannon_entropy,
+    _shannon_entropy_batch,
     extract_search_terms,
     get_secret_entropy,
+    classification_cache_info,
+    verdict_cache_from_config,
     PRECEDING_KEYWORDS,
     _looks_like_word,
+    select_tarball_repos,
+    scan_repository_tarball,
+    DEFAULT_TARBALL_THRESHOLD,
 )
-from GitSleuth_API import RateLimitException, get_headers, check_rate_limit
+from GitSleuth_API import RateLimitException, get_headers
 from OAuth_Manager import oauth_login, fetch_username
+from Query_Sharder import ShardedCodeSearch, item_key
 # Token management imports are kept for future use
 from Token_Manager import load_tokens, add_token, delete_token
 
@@ -78,8 +87,11 @@ SIMPLE_SECRET_RE = re.compile(
 )
 
 
-def _basic_features(text: str) -> list[float]:
-    """Return entropy, composition and casing features for *text*."""
+def _basic_features(text: str, entropy: Optional[float] = None) -> list[float]:
+    """Return entropy, composition and casing features for *text*.
+
+    ``entropy`` may be passed when it was already computed in a batch.
+    """
     if not isinstance(text, str):
         text = "" if text is None else str(text)
     length = len(text)
@@ -88,7 +100,8 @@ def _basic_features(text: str) -> list[float]:
     numeric = sum(ch.isdigit() for ch in text)
     alpha = sum(ch.isalpha() for ch in text)
     special = length - numeric - alpha
-    entropy = _shannon_entropy(text)
+    if entropy is None:
+        entropy = _shannon_entropy(text)
     is_upper = float(text.isupper())
     has_space = float(" " in text)
     looks_word = float(_looks_like_word(text))
@@ -191,8 +204,21 @@ def _structural_features(snippet: str) -> list[int]:
     )
     return [assignment, func_arg]
 
-def compute_features(text: str, file_path: str = "") -> list[float]:
-    """Return entropy, composition and contextual features for a snippet."""
+def _features_batch(feature_fn, texts, *args) -> list[list[float]]:
+    """Apply ``feature_fn`` to every text, computing all entropies in one batch."""
+    texts = ["" if t is None else str(t) for t in texts]
+    entropies = _shannon_entropy_batch(texts)
+    return [
+        feature_fn(text, *extra, entropy=float(entropy))
+        for text, entropy, *extra in zip(texts, entropies, *args)
+    ]
+
+
+def compute_features(text: str, file_path: str = "", entropy: Optional[float] = None) -> list[float]:
+    """Return entropy, composition and contextual features for a snippet.
+
+    ``entropy`` may be passed when it was already computed in a batch.
+    """
 
     if not isinstance(text, str):
         text = "" if text is None else str(text)
@@ -207,7 +233,8 @@ def compute_features(text: str, file_path: str = "") -> list[float]:
         numeric = sum(ch.isdigit() for ch in text)
         alpha = sum(ch.isalpha() for ch in text)
         special = length - numeric - alpha
-        entropy = _shannon_entropy(text)
+        if entropy is None:
+            entropy = _shannon_entropy(text)
         base = [entropy, float(length), numeric / length, alpha / length, special / length]
 
     return base + _file_type_features(file_path) + _structural_features(text)
@@ -279,6 +306,8 @@ class GitSleuthGUI(QMainWindow):
         self.filter_placeholders = config.get("FILTER_PLACEHOLDERS", True)
         self.exit_timer: Optional[QTimer] = None
         self.simple_model: Optional[LogisticRegression] = None
+        # Keep the UI responsive while the rate governor paces requests
+        GitSleuth_API.set_wait_function(self.wait_with_events)
         self.initUI()
         self.restore_oauth_session()
 
@@ -594,6 +623,7 @@ class GitSleuthGUI(QMainWindow):
         """Clear stored OAuth credentials and update the UI."""
         delete_token("oauth_token")
         os.environ.pop("GITHUB_OAUTH_TOKEN", None)
+        GitSleuth_API.reset_token_pool()
         config["SAVED_USERNAME"] = ""
         save_config(config)
         self.oauth_button.setText("OAuth Login")
@@ -618,6 +648,7 @@ class GitSleuthGUI(QMainWindow):
             else:
                 delete_token("oauth_token")
                 os.environ.pop("GITHUB_OAUTH_TOKEN", None)
+                GitSleuth_API.reset_token_pool()
                 config["SAVED_USERNAME"] = ""
                 save_config(config)
         return False
@@ -874,6 +905,11 @@ class GitSleuthGUI(QMainWindow):
                 f"Search completed with {result_count} results."
             )
             logging.info(f"Search completed with {result_count} results.")
+            logging.info(f"Blob cache statistics: {GitSleuth_API.blob_cache_stats()}")
+            logging.info(f"Value classification cache: {classification_cache_info()}")
+            verdict_cache = verdict_cache_from_config(load_config())
+            if verdict_cache is not None:
+                logging.info(f"Scanner verdict cache statistics: {verdict_cache.stats()}")
             QApplication.processEvents()  # Reflect updated button states
 
 
@@ -928,22 +964,36 @@ class GitSleuthGUI(QMainWindow):
 
     def process_query(self, query, max_retries, config, search_term, description):
         retry_count = 0
+        pages = None
+        # Repositories scanned from a tarball for this query
+        self.tarball_scans = {}
+        # Files already processed; a page interrupted by a rate limit is
+        # repeated after the retry and its finished files are skipped
+        self.handled_items = set()
+        # Compile the snippet rules once for all results of the query
+        self.detector = SnippetDetector.from_config(
+            query, config, filter_placeholders=self.filter_placeholders
+        )
         while retry_count < max_retries and self.search_active:
             try:
-                headers = get_headers()
-                remaining, wait_time = check_rate_limit(headers)
-                if remaining == 0:
-                    logging.warning("Rate limit exhausted before request.")
-                    if switch_token(config):
-                        headers = get_headers()
-                    else:
-                        self.wait_with_events(wait_time or 60)
-                if not self.search_active:
-                    break
-                search_results = GitSleuth_API.search_github_code(query, headers)
-                if not self.search_active:
-                    break
-                self.handle_search_results(search_results, query, description, headers, search_term)
+                # Requests are paced by the rate governor, so no /rate_limit
+                # round trip is needed before each query
+                headers = get_headers("code_search")
+                if pages is None:
+                    pages = ShardedCodeSearch(
+                        query, headers, shard=config.get("SHARD_LARGE_QUERIES", True)
+                    )
+                # Resume from the last page with the current token after a retry
+                pages.headers = headers
+                for search_results in pages:
+                    if not self.search_active:
+                        break
+                    self.handle_search_results(search_results, query, description, headers, search_term)
+                if pages.truncated:
+                    logging.warning(
+                        f"Query '{query}' matched {pages.total_count} files; "
+                        f"only the first {pages.fetched} were processed."
+                    )
                 break
             except RateLimitException as e:
                 logging.warning(f"Rate limit reached for token. {str(e)}")
@@ -962,24 +1012,118 @@ class GitSleuthGUI(QMainWindow):
                 break
 
 
+    def detector_for(self, query, filter_placeholders=True):
+        """Return the compiled snippet rules for ``query``, reusing the current ones."""
+        detector = getattr(self, 'detector', None)
+        if (
+            detector is None
+            or detector.query != query
+            or detector.filter_placeholders != filter_placeholders
+        ):
+            detector = SnippetDetector.from_config(query, filter_placeholders=filter_placeholders)
+            self.detector = detector
+        return detector
+
     def handle_search_results(self, search_results, query, description, headers, search_term):
         if self.search_active and search_results and 'items' in search_results:
-            for item in search_results['items']:
+            config = load_config()
+            detector = self.detector_for(query, self.filter_placeholders)
+            handled_items = getattr(self, 'handled_items', set())
+            items = [
+                item for item in search_results['items']
+                if not detector.is_ignored_path(item.get('path', ''))
+                and item_key(item) not in handled_items
+            ]
+            tarball_scans = getattr(self, 'tarball_scans', {})
+            threshold = config.get("TARBALL_THRESHOLD", DEFAULT_TARBALL_THRESHOLD)
+            partial_scans = {}
+            for repo_name in sorted(select_tarball_repos(items, threshold, exclude=tarball_scans)):
                 if not self.search_active:
-                    break
-                self.process_search_item(
-                    item,
-                    query,
-                    description,
-                    headers,
-                    search_term,
-                    self.filter_placeholders,
+                    return
+                scanned = partial_scans[repo_name] = set()
+                tarball_scans[repo_name] = self.process_repository_tarball(
+                    repo_name, detector, description, headers, search_term, scanned
                 )
+            items = [
+                item for item in items
+                if not tarball_scans.get(item['repository']['full_name'])
+                and item.get('path', '') not in partial_scans.get(item['repository']['full_name'], ())
+            ]
+            fetched = GitSleuth_API.fetch_file_contents_concurrently(items, headers)
+            try:
+                if detector.uses_external_scanners:
+                    # Files are verified in the background while the rest of the
+                    # page downloads; gitleaks then runs once for the whole page
+                    pages = []
+                    for item, contents in fetched:
+                        if not self.search_active:
+                            return
+                        scan = extract_snippets(
+                            contents or "", query, detector=detector, return_spans=True, wait=False
+                        )
+                        pages.append((item, contents, scan))
+                        QApplication.processEvents()
+                    self.status_bar.showMessage(f"Verifying {len(pages)} files with external scanners")
+                    QApplication.processEvents()
+                    page_snippets = detector.collect(scan for _, _, scan in pages)
+                    pending = [
+                        (item, contents, snippets)
+                        for (item, contents, _), snippets in zip(pages, page_snippets)
+                    ]
+                else:
+                    pending = ((item, contents, None) for item, contents in fetched)
+                for item, file_contents, snippets in pending:
+                    if not self.search_active:
+                        break
+                    self.process_file_contents(
+                        item,
+                        file_contents,
+                        query,
+                        description,
+                        search_term,
+                        self.filter_placeholders,
+                        snippets=snippets,
+                    )
+                    handled_items.add(item_key(item))
+            finally:
+                fetched.close()
 
-    def process_search_item(
-        self, item, query, description, headers, search_term, filter_placeholders=True
+    def process_repository_tarball(
+        self, repo_name, detector, description, headers, search_term, scanned
+    ):
+        """Scan a whole repository from its tarball; return whether it completed."""
+        self.status_bar.showMessage(f"Scanning {repo_name} from its tarball")
+        QApplication.processEvents()
+        findings = scan_repository_tarball(repo_name, detector, headers, scanned_paths=scanned)
+        query_terms = detector.query_terms
+        try:
+            for file_path, snippets in findings:
+                if not self.search_active:
+                    return False
+                entropies = [
+                    get_secret_entropy(s, query_terms=query_terms, rule_pack=detector.rule_pack)
+                    for s in snippets
+                ]
+                self.update_results_table(
+                    repo_name, file_path, snippets, search_term, description, entropies
+                )
+                QApplication.processEvents()
+        except (RateLimitException, requests.RequestException, tarfile.TarError) as e:
+            logging.warning(f"Tarball scan of {repo_name} failed, fetching files individually: {e}")
+            return False
+        finally:
+            findings.close()
+        return True
+
+    def process_file_contents(
+        self, item, file_contents, query, description, search_term, filter_placeholders=True,
+        snippets=None,
     ):
+        """Extract snippets from downloaded file contents and show them.
 
+        ``snippets`` are the spans already found by a page-wide
+        :meth:`SnippetDetector.scan_batch`; they are extracted here when not given.
+        """
         if not self.search_active:
             return
         repo_name = item['repository']['full_name']
@@ -987,17 +1131,17 @@ class GitSleuthGUI(QMainWindow):
         self.status_bar.showMessage(f"Processing {repo_name}")
         QApplication.processEvents()
         file_path = item.get('path', '')
-        config = load_config()
-        patterns = config.get("IGNORED_PATH_PATTERNS", [])
-        if _path_is_ignored(file_path, patterns):
-            return
-        file_contents = GitSleuth_API.get_file_contents(repo_name, file_path, headers)
         if file_contents:
-            snippets = extract_snippets(
-                file_contents, query, filter_placeholders=filter_placeholders
-            )
-            query_terms = extract_search_terms(query)
-            entropies = [get_secret_entropy(s, query_terms=query_terms) for s in snippets]
+            detector = self.detector_for(query, filter_placeholders)
+            if snippets is None:
+                snippets = extract_snippets(
+                    file_contents, query, detector=detector, return_spans=True
+                )
+            query_terms = detector.query_terms
+            entropies = [
+                get_secret_entropy(s.text, query_terms=query_terms, rule_pack=detector.rule_pack)
+                for s in snippets
+            ]
 
             self.update_results_table(
                 repo_name,
@@ -1014,6 +1158,7 @@ class GitSleuthGUI(QMainWindow):
         return link_label
     
     def update_results_table(self, repo_name, file_path, snippets, search_term, description, entropies=None):
+        """Add result rows; ``snippets`` are strings or ``SnippetSpan`` records."""
         if not self.search_active:
             return
         github_base_url = "https://github.com/"
@@ -1021,6 +1166,10 @@ class GitSleuthGUI(QMainWindow):
         for snippet, score in zip(snippets, scores):
             if not self.search_active:
                 break
+            line = getattr(snippet, 'line', None)
+            # Provider secrets are described by the rule that found them
+            row_description = getattr(snippet, 'secret_type', None) or description
+            snippet = str(snippet)
             if self.high_entropy_checkbox.isChecked() and (
 
                 score is None or score < HIGH_ENTROPY_THRESHOLD
@@ -1037,7 +1186,7 @@ class GitSleuthGUI(QMainWindow):
             search_item.setTextAlignment(Qt.AlignCenter)
             self.results_table.setItem(row_position, 0, search_item)
             # Description column
-            description_item = QTableWidgetItem(description)
+            description_item = QTableWidgetItem(row_description)
             description_item.setTextAlignment(Qt.AlignCenter)
             self.results_table.setItem(row_position, 1, description_item)
 
@@ -1049,6 +1198,8 @@ class GitSleuthGUI(QMainWindow):
 
             # File path column with clickable link
             file_url = f"{repo_url}/blob/main/{file_path}"
+            if line:
+                file_url += f"#L{line}"
             file_link_label = self.create_clickable_link(file_path, file_url)
             file_link_label.setAlignment(Qt.AlignCenter)
             self.results_table.setCellWidget(row_position, 3, file_link_label)
@@ -1179,9 +1330,7 @@ class GitSleuthGUI(QMainWindow):
             vectorizer = TfidfVectorizer()
             text_features = vectorizer.fit_transform(df["Snippet"])
             paths = df.get("File Path", ["" for _ in range(len(df))])
-            extra = np.array(
-                [compute_features(snippet, path) for snippet, path in zip(df["Snippet"], paths)]
-            )
+            extra = np.array(_features_batch(compute_features, df["Snippet"], paths))
             X = hstack([text_features, csr_matrix(extra)])
 
             y = df["Label"].apply(lambda x: 1 if x == "True Positive" else 0)
@@ -1211,17 +1360,17 @@ class GitSleuthGUI(QMainWindow):
     def load_basic_training(self) -> tuple[list[list[float]], list[int]]:
         """Load passwords and placeholders from ``training_data.csv``."""
         df = pd.read_csv("training_data.csv")
-        X: list[list[float]] = []
+        texts: list[str] = []
         y: list[int] = []
         for pwd in df.get("RealPassword", []):
             if isinstance(pwd, str) and pwd:
-                X.append(_basic_features(pwd))
+                texts.append(pwd)
                 y.append(1)
         for pwd in df.get("Placeholder", []):
             if isinstance(pwd, str) and pwd:
-                X.append(_basic_features(pwd))
+                texts.append(pwd)
                 y.append(0)
-        return X, y
+        return _features_batch(_basic_features, texts), y
 
     def train_sample_model(self) -> None:
         """Train example model and display accuracy."""
@@ -1259,7 +1408,7 @@ class GitSleuthGUI(QMainWindow):
             if phrases.empty:
                 self.ml_output.append("No testing data available.")
                 return
-            X_test = [_basic_features(p) for p in phrases]
+            X_test = _features_batch(_basic_features, phrases)
             preds = self.simple_model.predict(X_test)
             acc = accuracy_score(labels, preds)
             self.ml_output.append(
@@ -1428,6 +1577,7 @@ class TokenManagementDialog(QDialog):
         token_value = self.token_input.text()
         if token_name and token_value:
             add_token(token_name, token_value)
+            GitSleuth_API.reset_token_pool()
             self.load_tokens()
             dialog.close()
 
@@ -1439,6 +1589,7 @@ class TokenManagementDialog(QDialog):
         if selected_row != -1:
             token_name = self.token_table.item(selected_row, 0).text()
             delete_token(token_name)
+            GitSleuth_API.reset_token_pool()
             self.load_tokens()
 
     def start_oauth(self):
@@ -0,0 +1,371 @@
+"""Read blobs and history from local Git repositories without the GitHub API."""
+
+import json
+import logging
+import os
+import re
+import subprocess
+
+DEFAULT_GIT_EXECUTABLE = "git"
+DEFAULT_MAX_BLOB_BYTES = 1024 * 1024
+BINARY_SNIFF_BYTES = 8192
+DEFAULT_CHECKPOINT_FILE = os.path.join(".gitsleuth_cache", "history_checkpoints.json")
+
+BATCH_CHECK_FORMAT = "%(objectname) %(objecttype) %(objectsize) %(rest)"
+HUNK_HEADER_RE = re.compile(r"^@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+C_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13, '"': 34, "\\": 92}
+
+
+class GitError(Exception):
+    """Raised when a git command fails."""
+
+
+def _decode(data: bytes) -> str | None:
+    """Return *data* as text, or None if it looks binary."""
+    if b"\0" in data[:BINARY_SNIFF_BYTES]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def _diff_path(header: str) -> str | None:
+    """Return the path in a ``+++ b/<path>`` diff header, or None for ``/dev/null``.
+
+    git ends the header with a TAB when the path contains a space, and
+    quotes paths with special characters using C-style escapes.
+    """
+    target = header[4:]
+    if target.endswith("\t"):
+        target = target[:-1]
+    if len(target) >= 2 and target[0] == target[-1] == '"':
+        raw = bytearray()
+        body = target[1:-1]
+        i = 0
+        while i < len(body):
+            char = body[i]
+            if char == "\\" and i + 1 < len(body):
+                octal = body[i + 1:i + 4]
+                if len(octal) == 3 and all(c in "01234567" for c in octal):
+                    raw.append(int(octal, 8))
+                    i += 4
+                    continue
+                if body[i + 1] in C_ESCAPES:
+                    raw.append(C_ESCAPES[body[i + 1]])
+                    i += 2
+                    continue
+            raw += char.encode("utf-8", errors="surrogateescape")
+            i += 1
+        target = raw.decode("utf-8", errors="replace")
+    return target[2:] if target.startswith("b/") else None
+
+
+def _stop(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+
+
+class CatFileReader:
+    """Read objects through one long-lived ``git cat-file --batch`` process.
+
+    Starting git once per blob dominates the runtime on large histories, so
+    object names are written to the process's stdin and the contents are
+    read back from its stdout as they arrive.
+    """
+
+    def __init__(self, repo_path: str, git: str = DEFAULT_GIT_EXECUTABLE):
+        self.repo_path = repo_path
+        self.process = subprocess.Popen(
+            [git, "-C", repo_path, "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, sha: str) -> tuple[str, bytes] | None:
+        """Return ``(object_type, data)`` for *sha*, or None if it is missing."""
+        try:
+            self.process.stdin.write(sha.encode("ascii") + b"\n")
+            self.process.stdin.flush()
+        except OSError as exc:
+            raise GitError(f"git cat-file stopped in {self.repo_path}: {exc}") from exc
+        header = self.process.stdout.readline()
+        if not header:
+            raise GitError(f"git cat-file stopped in {self.repo_path}")
+        parts = header.split()
+        if len(parts) != 3:
+            # "<sha> missing" or "<sha> ambiguous"
+            return None
+        size = int(parts[2])
+        data = self.process.stdout.read(size)
+        self.process.stdout.read(1)  # trailing newline
+        if len(data) != size:
+            raise GitError(f"Short read from git cat-file for {sha}")
+        return parts[1].decode("ascii"), data
+
+    def close(self) -> None:
+        if self.process.stdin and not self.process.stdin.closed:
+            self.process.stdin.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            _stop(self.process)
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_blob_entries(repo_path: str, git: str = DEFAULT_GIT_EXECUTABLE):
+    """Yield ``(sha, size, path)`` for every blob reachable from any ref.
+
+    ``git rev-list --objects --all`` is piped into ``git cat-file
+    --batch-check`` so object types and sizes are known before any content
+    is read. Each blob is listed once, with one of the paths it appeared at.
+    """
+    rev_list = subprocess.Popen(
+        [git, "-C", repo_path, "rev-list", "--objects", "--all"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    check = subprocess.Popen(
+        [git, "-C", repo_path, "cat-file", f"--batch-check={BATCH_CHECK_FORMAT}"],
+        stdin=rev_list.stdout,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    rev_list.stdout.close()
+    finished = False
+    try:
+        for line in check.stdout:
+            parts = line.decode("utf-8", errors="replace").rstrip("\n").split(" ", 3)
+            if len(parts) < 3 or parts[1] != "blob":
+                continue
+            yield parts[0], int(parts[2]), parts[3] if len(parts) > 3 else ""
+        finished = True
+    finally:
+        if not finished:
+            # Abandoned by the caller: don't wait for the whole history
+            _stop(rev_list)
+            _stop(check)
+        check.wait()
+        check.stdout.close()
+        stderr = rev_list.stderr.read().decode("utf-8", errors="replace").strip()
+        rev_list.stderr.close()
+        rev_list.wait()
+        if finished and rev_list.returncode:
+            raise GitError(f"git rev-list failed in {repo_path}: {stderr}")
+
+
+def iter_repository_blobs(repo_path: str, seen: set | None = None,
+                          max_bytes: int = DEFAULT_MAX_BLOB_BYTES,
+                          git: str = DEFAULT_GIT_EXECUTABLE):
+    """Yield ``(sha, path, text)`` for the text blobs in a repository's history.
+
+    Parameters
+    ----------
+    repo_path : str
+        Working tree or bare repository to read.
+    seen : set or None, optional
+        Blob SHAs to skip. New SHAs are added, so sharing one set between
+        repositories skips blobs they have in common (forks, mirrors).
+    max_bytes : int, optional
+        Blobs larger than this are skipped without being read.
+    """
+    with CatFileReader(repo_path, git) as reader:
+        for sha, size, path in iter_blob_entries(repo_path, git):
+            if seen is not None:
+                if sha in seen:
+                    continue
+                seen.add(sha)
+            if size > max_bytes:
+                logging.debug(f"Skipping {path} ({sha}): {size} bytes")
+                continue
+            obj = reader.read(sha)
+            if obj is None:
+                continue
+            text = _decode(obj[1])
+            if text:
+                yield sha, path, text
+
+
+def list_refs(repo_path: str, git: str = DEFAULT_GIT_EXECUTABLE) -> dict[str, str]:
+    """Return the commit every branch, remote branch and tag points to."""
+    result = subprocess.run(
+        [git, "-C", repo_path, "for-each-ref",
+         "--format=%(refname) %(objectname) %(*objectname)",
+         "refs/heads", "refs/remotes", "refs/tags"],
+        capture_output=True,
+    )
+    if result.returncode:
+        raise GitError(f"git for-each-ref failed in {repo_path}: {result.stderr.decode(errors='replace').strip()}")
+    refs = {}
+    for line in result.stdout.decode("utf-8", errors="replace").splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            # Annotated tags are peeled to the commit they point to
+            refs[parts[0]] = parts[-1]
+    return refs
+
+
+def _existing_commits(repo_path: str, shas, git: str = DEFAULT_GIT_EXECUTABLE) -> set:
+    """Return the subset of *shas* that are commits in the repository."""
+    shas = sorted(set(shas))
+    if not shas:
+        return set()
+    result = subprocess.run(
+        [git, "-C", repo_path, "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+        input="\n".join(shas).encode("ascii") + b"\n",
+        capture_output=True,
+    )
+    found = set()
+    for line in result.stdout.decode("ascii", errors="replace").splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[1] == "commit":
+            found.add(parts[0])
+    return found
+
+
+def iter_added_lines(repo_path: str, include, exclude=(), git: str = DEFAULT_GIT_EXECUTABLE):
+    """Yield ``(commit, path, text)`` with the lines each commit added to a file.
+
+    The output of ``git log -p -U0`` is parsed while it streams, using the
+    line counts in the hunk headers to tell added lines from diff headers.
+    Removed lines are ignored, and so are binary files and merge commits
+    (whose changes are already part of the merged commits). Commits are
+    passed on stdin, so repositories with many refs do not overflow the
+    command line.
+
+    Parameters
+    ----------
+    include : iterable of str
+        Commits whose history is scanned.
+    exclude : iterable of str
+        Commits whose history is skipped (``--not``).
+    """
+    include = list(include)
+    if not include:
+        return
+    command = [
+        git, "-C", repo_path, "-c", "core.quotePath=false",
+        "log", "-p", "-U0", "--no-color", "--no-ext-diff", "--no-textconv",
+        "--src-prefix=a/", "--dst-prefix=b/", "--format=commit %H", "--stdin", "--",
+    ]
+    revisions = include + [f"^{sha}" for sha in exclude]
+    process = subprocess.Popen(
+        command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        # git reads every revision before writing any output
+        process.stdin.write(("\n".join(revisions) + "\n").encode("ascii"))
+        process.stdin.close()
+    except OSError:
+        # git exited early; its error is reported below
+        pass
+    commit = path = None
+    added = []
+    old_lines = new_lines = 0
+    finished = False
+    try:
+        for raw in process.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip("\n")
+            if old_lines > 0 or new_lines > 0:
+                if line.startswith("+"):
+                    added.append(line[1:])
+                    new_lines -= 1
+                elif line.startswith("-"):
+                    old_lines -= 1
+                elif not line.startswith("\\"):
+                    old_lines -= 1
+                    new_lines -= 1
+                continue
+            if line.startswith("@@"):
+                match = HUNK_HEADER_RE.match(line)
+                if match:
+                    old_lines = int(match.group(1) or 1)
+                    new_lines = int(match.group(2) or 1)
+                continue
+            if line.startswith(("commit ", "diff --git ")):
+                if commit and path and added:
+                    yield commit, path, "\n".join(added)
+                added = []
+                path = None
+                if line.startswith("commit "):
+                    commit = line[len("commit "):]
+            elif line.startswith("+++ "):
+                path = _diff_path(line)
+        if commit and path and added:
+            yield commit, path, "\n".join(added)
+        finished = True
+    finally:
+        if not finished:
+            _stop(process)
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf-8", errors="replace").strip()
+        process.stderr.close()
+        process.wait()
+        if finished and process.returncode:
+            raise GitError(f"git log failed in {repo_path}: {stderr}")
+
+
+class HistoryCheckpoints:
+    """Last scanned commit of every ref, per repository, stored as JSON.
+
+    A history scan only walks commits that are not reachable from the refs
+    recorded for the repository, so a rerun picks up new commits only.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_FILE):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self._data = json.load(f)
+        except FileNotFoundError:
+            self._data = {}
+        except (OSError, ValueError) as exc:
+            logging.warning(f"Ignoring unreadable history checkpoints {path}: {exc}")
+            self._data = {}
+
+    @staticmethod
+    def _key(repo_path: str) -> str:
+        return os.path.abspath(repo_path)
+
+    def get(self, repo_path: str) -> dict[str, str]:
+        """Return ``{ref: commit}`` recorded by the last completed scan."""
+        return dict(self._data.get(self._key(repo_path), {}))
+
+    def update(self, repo_path: str, refs: dict[str, str]) -> None:
+        """Record *refs* as scanned and save the file."""
+        self._data[self._key(repo_path)] = dict(refs)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self._data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logging.warning(f"Failed to save history checkpoints {self.path}: {exc}")
+
+
+def iter_new_history(repo_path: str, checkpoints: HistoryCheckpoints | None = None,
+                     git: str = DEFAULT_GIT_EXECUTABLE):
+    """Yield the lines added by commits not covered by earlier scans.
+
+    Every commit reachable from any ref is visited once, except those
+    reachable from the refs in *checkpoints*. Checkpoints whose commits no
+    longer exist (after a force push and garbage collection) are ignored.
+    The checkpoints are updated to the current refs only after the history
+    has been consumed completely, so an interrupted scan is repeated.
+    """
+    refs = list_refs(repo_path, git)
+    previous = checkpoints.get(repo_path) if checkpoints else {}
+    exclude = _existing_commits(repo_path, previous.values(), git)
+    include = sorted(set(refs.values()) - exclude)
+    if include:
+        yield from iter_added_lines(repo_path, include, sorted(exclude), git)
+    else:
+        logging.info(f"No new commits in {repo_path}")
+    if checkpoints is not None:
+        checkpoints.update(repo_path, refs)
@@ -0,0 +1,181 @@
+"""Split broad code search queries into shards below GitHub's result cap."""
+
+import logging
+import math
+import re
+
+import GitSleuth_API
+from GitSleuth_API import CODE_SEARCH_RESULT_CAP, CodeSearchPaginator
+
+# GitHub only indexes files smaller than 384 KB for code search
+MAX_INDEXED_FILE_SIZE = 384 * 1024
+MAX_SHARD_DEPTH = 20
+
+SIZE_QUALIFIER_RE = re.compile(r"(?<!\S)size:\S+", re.I)
+
+
+def with_size_range(query: str, low: int, high: int) -> str:
+    """Return *query* restricted to files between *low* and *high* bytes."""
+    return f"{query.strip()} size:{low}..{high}"
+
+
+def _split_point(low: int, high: int) -> int:
+    """Return where to bisect ``low..high``.
+
+    Most matching files are small, so the range is split at its geometric
+    midpoint rather than the arithmetic one.
+    """
+    mid = int(math.sqrt((low + 1) * (high + 1))) - 1
+    return min(max(mid, low), high - 1)
+
+
+def plan_shards(query, count_results, cap=CODE_SEARCH_RESULT_CAP,
+                low=0, high=MAX_INDEXED_FILE_SIZE, max_depth=MAX_SHARD_DEPTH):
+    """Return disjoint sub-queries whose result counts are each at most *cap*.
+
+    The query is restricted with ``size:`` ranges that are bisected
+    recursively until every shard is under the cap. Empty shards are
+    dropped. A shard that cannot be split further (a single byte size or
+    the depth limit) is kept even if it still exceeds the cap, and so is a
+    shard whose count failed twice, so no size range is lost silently.
+
+    Parameters
+    ----------
+    query : str
+        Query as produced by ``create_search_queries``.
+    count_results : callable
+        Function returning ``total_count`` for a query string, or None if
+        the count could not be retrieved.
+    """
+    if SIZE_QUALIFIER_RE.search(query):
+        logging.warning(f"Query already filters by size, not sharding: {query}")
+        return [query]
+    total = count_results(query)
+    if total is None:
+        logging.warning(f"Could not count results, not sharding: {query}")
+        return [query]
+    if total <= cap:
+        return [query]
+
+    shards = []
+    stack = [(low, high, 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        shard = with_size_range(query, lo, hi)
+        total = count_results(shard)
+        if total is None:
+            total = count_results(shard)
+        if total is None:
+            logging.warning(f"Could not count results, keeping shard unsplit: {shard}")
+            shards.append((lo, shard))
+            continue
+        if total == 0:
+            continue
+        if total <= cap or lo >= hi or depth >= max_depth:
+            if total > cap:
+                logging.warning(f"Shard still exceeds {cap} results ({total}): {shard}")
+            shards.append((lo, shard))
+            continue
+        mid = _split_point(lo, hi)
+        stack.append((mid + 1, hi, depth + 1))
+        stack.append((lo, mid, depth + 1))
+    shards.sort()
+    logging.info(f"Split query into {len(shards)} shards: {query}")
+    return [shard for _, shard in shards]
+
+
+def item_key(item: dict) -> tuple:
+    """Return the identity of a code search item (repository, path, SHA)."""
+    return (
+        item.get('repository', {}).get('full_name'),
+        item.get('path'),
+        item.get('sha'),
+    )
+
+
+class ShardedCodeSearch:
+    """
+    Iterates over code search pages, sharding queries that hit the cap.
+
+    The query is first searched as-is. If GitHub reports more than 1000
+    matches, the remaining results are collected through the shards from
+    :func:`plan_shards` instead. Items seen on earlier pages or shards are
+    dropped, so every (repository, path, SHA) is yielded once. Like
+    :class:`GitSleuth_API.CodeSearchPaginator` the iteration resumes after a
+    :class:`GitSleuth_API.RateLimitException`, repeating the interrupted
+    page, and ``headers`` may be replaced in between.
+    """
+
+    def __init__(self, query, headers, shard=True, cap=CODE_SEARCH_RESULT_CAP):
+        self.query = query
+        self.headers = headers
+        self.shard = shard
+        self.cap = cap
+        self.total_count = None
+        self.incomplete_results = False
+        self.fetched = 0
+        self.shards = None
+        self._pending = [query]
+        self._current = None
+        self._needs_plan = False
+        self._counts = {}
+        self._seen = set()
+
+    @property
+    def truncated(self):
+        """True when some matches could not be retrieved."""
+        if self.shards is not None:
+            return any(self._counts.get(q, 0) > self.cap for q in self.shards)
+        return bool(self.total_count and self.total_count > self.cap)
+
+    def _count(self, query):
+        if query not in self._counts:
+            total = GitSleuth_API.count_code_search_results(query, self.headers)
+            if total is None:
+                # Not cached, so plan_shards can retry
+                return None
+            self._counts[query] = total
+        return self._counts[query]
+
+    def _dedupe(self, page):
+        items = []
+        keys = set()
+        for item in page['items']:
+            key = item_key(item)
+            if key not in self._seen and key not in keys:
+                keys.add(key)
+                items.append(item)
+        return {**page, 'items': items}, keys
+
+    def __iter__(self):
+        while True:
+            if self._needs_plan:
+                self._counts[self.query] = self.total_count
+                shards = plan_shards(self.query, self._count, self.cap)
+                self.shards = shards
+                self._needs_plan = False
+                if shards != [self.query]:
+                    # Otherwise keep paging through the unsharded query
+                    self._pending = list(shards)
+                    self._current = None
+            if self._current is None:
+                if not self._pending:
+                    return
+                self._current = CodeSearchPaginator(self._pending.pop(0), self.headers)
+            current = self._current
+            current.headers = self.headers
+            for page in current:
+                if self.total_count is None:
+                    self.total_count = current.total_count
+                self.incomplete_results = self.incomplete_results or current.incomplete_results
+                page, keys = self._dedupe(page)
+                if page['items']:
+                    yield page
+                # Items count as seen once the consumer has finished the page
+                self._seen.update(keys)
+                self.fetched += len(keys)
+                if self.shard and self.shards is None and current.truncated:
+                    self._needs_plan = True
+                    break
+            if not self._needs_plan:
+                self._current = None
@@ -0,0 +1,119 @@
+"""Client-side pacing of GitHub API requests based on rate limit headers."""
+
+import logging
+import threading
+import time
+
+# Share of the remaining quota that may be used in a burst; the rest is
+# spread evenly until the rate limit window resets.
+DEFAULT_BURST_FRACTION = 0.5
+# Backoff applied after a secondary (abuse) rate limit without Retry-After
+SECONDARY_BACKOFF_BASE = 60.0
+SECONDARY_BACKOFF_MAX = 15 * 60.0
+
+
+class TokenBucket:
+    """Token bucket whose rate is derived from the remaining quota.
+
+    ``reserve`` hands out permits even when the bucket is empty and returns
+    how long the caller has to wait, so concurrent callers queue up in
+    order instead of all waking at the same time.
+    """
+
+    def __init__(self):
+        self.capacity = None
+        self.rate = 0.0
+        self.tokens = 0.0
+        self.reset_at = 0.0
+        self.updated = time.time()
+
+    def configure(self, remaining: int, reset_at: float, burst_fraction: float, now: float) -> None:
+        """Size the bucket so no more than *remaining* permits fit before *reset_at*."""
+        self._refill(now)
+        window = max(reset_at - now, 1.0)
+        capacity = max(remaining * burst_fraction, 1.0) if remaining > 0 else 0.0
+        self.rate = max(remaining - capacity, 0.0) / window
+        if self.capacity is None:
+            self.tokens = capacity
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+        self.reset_at = reset_at
+
+    def _refill(self, now: float) -> None:
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take one permit and return the seconds to wait before using it."""
+        if self.capacity is None or now >= self.reset_at:
+            # Unknown quota or a new window: nothing to pace against
+            self.capacity = None
+            self.updated = now
+            return 0.0
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        if self.rate <= 0:
+            return self.reset_at - now
+        return min(-self.tokens / self.rate, self.reset_at - now)
+
+
+class RateGovernor:
+    """Pace requests per token and rate limit resource ahead of time.
+
+    Every response updates the bucket for its token and resource from the
+    ``X-RateLimit-*`` headers. Secondary rate limit responses trigger a
+    global backoff that doubles on consecutive hits and is cleared by the
+    first successful response after it expires.
+    """
+
+    def __init__(self, burst_fraction: float = DEFAULT_BURST_FRACTION):
+        self.burst_fraction = burst_fraction
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._backoff_until = 0.0
+        self._secondary_hits = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, token: str, resource: str) -> TokenBucket:
+        key = (token, resource)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket()
+        return self._buckets[key]
+
+    def reserve(self, token: str, resource: str) -> float:
+        """Reserve a request for *token* and return the seconds to wait."""
+        now = time.time()
+        with self._lock:
+            delay = self._bucket(token, resource).reserve(now)
+            return max(delay, self._backoff_until - now, 0.0)
+
+    def observe(self, token: str, resource: str, headers, secondary_limit: bool = False) -> None:
+        """Update pacing from a response sent with *token*."""
+        now = time.time()
+        with self._lock:
+            if secondary_limit:
+                self._secondary_hits += 1
+                retry_after = headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    backoff = float(retry_after)
+                else:
+                    backoff = SECONDARY_BACKOFF_BASE * 2 ** (self._secondary_hits - 1)
+                backoff = min(backoff, SECONDARY_BACKOFF_MAX)
+                self._backoff_until = max(self._backoff_until, now + backoff)
+                logging.warning(f"Secondary rate limit hit, backing off for {int(backoff)}s")
+            elif self._secondary_hits and now >= self._backoff_until:
+                self._secondary_hits = 0
+
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+            if remaining is None or reset is None:
+                return
+            resource = headers.get("X-RateLimit-Resource", resource)
+            try:
+                self._bucket(token, resource).configure(
+                    int(remaining), float(reset), self.burst_fraction, now
+                )
+            except ValueError:
+                logging.debug("Ignoring malformed rate limit headers")
@@ -0,0 +1,122 @@
+"""Persistent cache of API response bodies for conditional GET requests."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+
+DEFAULT_CACHE_DIR = os.path.join(".gitsleuth_cache", "responses")
+DEFAULT_MAX_ENTRIES = 5000
+
+
+class ResponseCache:
+    """Store ETag/Last-Modified validators with the response body.
+
+    Entries are keyed on the request method and URL, plus the ``Accept``
+    media type that selects the body format. The token is left out so a
+    rotated token still revalidates the same entry. Entries are kept as
+    zlib-compressed JSON files named after the key hash, and the oldest are
+    dropped once more than ``max_entries`` are stored.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        self._entries = self._prune()
+
+    @staticmethod
+    def make_key(method: str, url: str, headers: dict | None) -> str:
+        """Return the cache key for a *method* request of *url* with *headers*."""
+        headers = headers or {}
+        parts = [method.upper(), url, headers.get("Accept", "")]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json.z")
+
+    def _prune(self, keep: int | None = None) -> int:
+        """Drop the oldest entries beyond *keep* (default ``max_entries``).
+
+        Returns the number of entries left.
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort()
+        excess = max(0, len(entries) - (self.max_entries if keep is None else keep))
+        for _, path in entries[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return len(entries) - excess
+
+    def _read(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                return json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as exc:
+            logging.debug(f"Ignoring unreadable cached response {key}: {exc}")
+            return None
+
+    def validators(self, key: str) -> dict:
+        """Return conditional request headers for a cached entry."""
+        entry = self._read(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def lookup(self, key: str):
+        """Return the cached body for *key*, or None if it is not cached."""
+        entry = self._read(key)
+        if entry is None:
+            return None
+        with self._lock:
+            self.revalidated += 1
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        return entry.get("body")
+
+    def store(self, key: str, response_headers, body) -> None:
+        """Save *body* when the response carries an ETag or Last-Modified."""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {"etag": etag, "last_modified": last_modified, "body": body}
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            added = not os.path.exists(path)
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(json.dumps(entry).encode("utf-8")))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as exc:
+            logging.debug(f"Failed to cache response {key}: {exc}")
+            return
+        if added:
+            with self._lock:
+                self._entries += 1
+                if self._entries > self.max_entries:
+                    # Leave some room so the next stores do not prune again
+                    self._entries = self._prune(self.max_entries * 9 // 10)
@@ -1,12 +1,65 @@
 """Utility functions for secret detection."""
 
+import atexit
+import functools
+import io
 import json
 import logging
+import multiprocessing
 import os
+import queue
+import shutil
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import Future
 from typing import Optional
 
+from Verdict_Cache import file_digest, fingerprint
+
+try:
+    from detect_secrets.__version__ import VERSION as DETECT_SECRETS_VERSION
+    from detect_secrets.core.plugins.util import get_mapping_from_secret_type_to_class
+    # The per-line scan used for files; ``scan_line`` instead searches eagerly
+    # and reports every word of a line as a high entropy string
+    from detect_secrets.core.scan import _process_line_based_plugins
+    from detect_secrets.settings import cache_bust, configure_settings_from_baseline
+    from detect_secrets.transformers import get_transformed_file
+except ImportError:
+    _process_line_based_plugins = None
+
+# ``_process_line_based_plugins`` is private, so it is only used on the
+# detect-secrets releases it was checked against (see requirements.txt)
+SUPPORTED_DETECT_SECRETS = ((1, 4), (1, 6))
+
+
+def _supported_detect_secrets() -> bool:
+    """Return True if the installed detect-secrets can be scanned in-process."""
+    if _process_line_based_plugins is None:
+        return False
+    try:
+        version = tuple(int(part) for part in DETECT_SECRETS_VERSION.split(".")[:2])
+    except ValueError:
+        return False
+    low, high = SUPPORTED_DETECT_SECRETS
+    return low <= version < high
+
+DEFAULT_GITLEAKS_EXECUTABLE = "gitleaks"
+SNIPPET_FILENAME = "snippet"
+# Batches at least this large are split across all pool workers
+MIN_SPLIT_BATCH = 64
+# Scan requests waiting for a worker before submit() blocks
+DEFAULT_MAX_PENDING = 32
+# Seconds between health checks of an idle worker and their timeout
+WORKER_PING_INTERVAL = 30.0
+WORKER_PING_TIMEOUT = 10.0
+# Seconds a worker may take for one request before it is restarted
+WORKER_SCAN_TIMEOUT = 120.0
+
+# detect-secrets keeps its plugin settings in a process-wide singleton
+_settings_lock = threading.Lock()
+_active_settings = None
+
 
 def snippet_has_secret(snippet: str, baseline_file: Optional[str] = None) -> bool:
     """Return True if detect-secrets finds a secret in the snippet.
@@ -21,27 +74,35 @@ def snippet_has_secret(snippet: str, baseline_file: Optional[str] = None) -> boo
     baseline_file : str, optional
         Path to a ``detect-secrets`` baseline file to apply allowlisting.
     """
+    return _cli_has_secret(snippet, baseline_file) is not False
+
+
+def _cli_has_secret(snippet: str, baseline_file: Optional[str] = None) -> Optional[bool]:
+    """Scan *snippet* with the detect-secrets CLI; None if the scan failed."""
     try:
         with tempfile.NamedTemporaryFile("w", delete=False) as tmp:
             tmp.write(snippet)
             tmp_path = tmp.name
 
-        cmd = ["detect-secrets", "scan", tmp_path, "--json"]
-        if baseline_file:
-            cmd.extend(["--baseline", baseline_file])
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # detect-secrets skips files outside the working directory
+        tmp_dir, tmp_name = os.path.split(tmp_path)
+        # ``scan --baseline`` would rewrite the baseline, so its allowlisted
+        # hashes are filtered here instead
+        cmd = ["detect-secrets", "scan", tmp_name]
+        result = subprocess.run(cmd, capture_output=True, text=True, cwd=tmp_dir)
         if result.returncode != 0:
             logging.debug("detect-secrets exited with code %s", result.returncode)
-            return True
+            return None
         data = json.loads(result.stdout or "{}")
-        findings = data.get("results", {}).get(tmp_path, [])
-        return bool(findings)
+        findings = data.get("results", {}).get(tmp_name, [])
+        allowed = _baseline_hashes(_read_baseline(baseline_file)) if baseline_file else frozenset()
+        return any(f.get("hashed_secret") not in allowed for f in findings)
     except FileNotFoundError:
         logging.debug("detect-secrets command not available")
-        return True
+        return None
     except Exception as exc:
         logging.debug("detect-secrets scanning failed: %s", exc)
-        return True
+        return None
     finally:
         if "tmp_path" in locals() and os.path.exists(tmp_path):
             try:
@@ -50,51 +111,554 @@ def snippet_has_secret(snippet: str, baseline_file: Optional[str] = None) -> boo
                 pass
 
 
-def gitleaks_has_secret(snippet: str, config_file: Optional[str] = None) -> bool:
-    """Return True if gitleaks detects a secret in the snippet.
+def _read_baseline(baseline_file: str) -> dict:
+    """Return the contents of a detect-secrets baseline, or {} if unreadable."""
+    try:
+        with open(baseline_file, "r") as f:
+            baseline = json.load(f)
+        if isinstance(baseline, dict):
+            return baseline
+    except (OSError, ValueError) as exc:
+        logging.warning("Ignoring unreadable detect-secrets baseline %s: %s", baseline_file, exc)
+    return {}
 
-    The function invokes the ``gitleaks`` CLI so the optional dependency
-    is only required when this check is enabled.
+
+def _baseline_hashes(baseline: dict) -> frozenset:
+    """Return the hashes of the secrets allowlisted in *baseline*."""
+    return frozenset(
+        finding["hashed_secret"]
+        for findings in (baseline.get("results") or {}).values()
+        for finding in findings
+        if "hashed_secret" in finding
+    )
+
+
+def _load_baseline(baseline_file: Optional[str]) -> tuple[dict, frozenset]:
+    """Return the detect-secrets settings and allowlisted hashes of a baseline.
+
+    Without a baseline, or one listing no plugins, every plugin is enabled
+    with the default filters like ``detect_secrets.settings.default_settings``.
+    """
+    baseline = _read_baseline(baseline_file) if baseline_file else {}
+    settings = {
+        key: baseline[key] for key in ("plugins_used", "filters_used") if baseline.get(key)
+    }
+    if not settings.get("plugins_used"):
+        settings.update(_default_plugins())
+    return settings, _baseline_hashes(baseline)
+
+
+def _default_plugins() -> dict:
+    return {
+        "plugins_used": [
+            {"name": plugin.__name__}
+            for plugin in get_mapping_from_secret_type_to_class().values()
+        ],
+    }
+
+
+def _apply_settings(settings: dict) -> None:
+    """Configure detect-secrets with *settings* unless it already is.
+
+    Plugins are instantiated on first use after a configuration change, so
+    keeping the settings across batches initializes them once per process.
+    """
+    global _active_settings
+    if _active_settings != settings:
+        cache_bust()
+        configure_settings_from_baseline(settings)
+        _active_settings = settings
+
+
+def _snippet_secrets(snippet: str):
+    """Yield the secrets detect-secrets reports for *snippet* as a file.
+
+    Like ``scan_file``, the eager transformers are only tried when the
+    lines as written contain no secret.
+    """
+    found = False
+    for secret in _process_line_based_plugins(
+        list(enumerate(snippet.splitlines(), start=1)), filename=SNIPPET_FILENAME
+    ):
+        found = True
+        yield secret
+    if found:
+        return
+    stream = io.StringIO(snippet)
+    stream.name = SNIPPET_FILENAME
+    lines = get_transformed_file(stream, use_eager_transformers=True)
+    if lines:
+        yield from _process_line_based_plugins(
+            list(enumerate(lines, start=1)), filename=SNIPPET_FILENAME
+        )
+
+
+def _scan_snippets(snippets, settings: dict, allowed_hashes: frozenset) -> list[bool]:
+    """Return for each snippet whether it has a secret not in *allowed_hashes*."""
+    flags = []
+    with _settings_lock:
+        _apply_settings(settings)
+        for snippet in snippets:
+            flags.append(any(
+                secret.secret_hash not in allowed_hashes
+                for secret in _snippet_secrets(snippet)
+            ))
+    return flags
+
+
+def _completed(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _gather(futures) -> Future:
+    """Return a future for the concatenated results of *futures*, in order."""
+    futures = list(futures)
+    combined = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        try:
+            combined.set_result([flag for future in futures for flag in future.result()])
+        except Exception as exc:
+            combined.set_exception(exc)
+
+    if not futures:
+        combined.set_result([])
+    for future in futures:
+        future.add_done_callback(done)
+    return combined
+
+
+def _cached_submit(snippets, submit, cache=None, scanner: Optional[str] = None) -> Future:
+    """Return a future telling whether each snippet has a secret.
+
+    Only snippets without a cached verdict are scanned, once each:
+    *submit* receives them and returns a future with a verdict per snippet,
+    None where the scan failed. Failed snippets count as secrets and are
+    not cached.
+    """
+    verdicts = cache.get_many(scanner, snippets) if cache is not None else [None] * len(snippets)
+    pending = list(dict.fromkeys(s for s, verdict in zip(snippets, verdicts) if verdict is None))
+    if not pending:
+        return _completed([verdict is not False for verdict in verdicts])
+    result = Future()
+
+    def finish(done):
+        try:
+            found = done.result()
+        except Exception as exc:
+            logging.debug("Secret scan failed: %s", exc)
+            found = [None] * len(pending)
+        if cache is not None:
+            cache.put_many(scanner, pending, found)
+        found = dict(zip(pending, found))
+        result.set_result([
+            (found[s] if verdict is None else verdict) is not False
+            for s, verdict in zip(snippets, verdicts)
+        ])
+
+    submit(pending).add_done_callback(finish)
+    return result
+
+
+class WorkerError(Exception):
+    """Raised when a scanner worker process dies or stops responding."""
+
+
+def _worker_main(conn, settings: dict, allowed_hashes: frozenset) -> None:
+    """Serve scan and ping requests from the parent process over *conn*."""
+    _apply_settings(settings)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        kind, payload = message
+        if kind == "ping":
+            conn.send(("pong", None))
+            continue
+        try:
+            conn.send(("ok", _scan_snippets(payload, settings, allowed_hashes)))
+        except Exception as exc:
+            conn.send(("error", repr(exc)))
+
+
+class _Worker:
+    """One scanner process and the parent's end of its pipe."""
+
+    def __init__(self, context, settings: dict, allowed_hashes: frozenset):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child, settings, allowed_hashes), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def request(self, message, timeout: float):
+        """Send *message* and return the reply, raising WorkerError on failure."""
+        try:
+            self.conn.send(message)
+            if not self.conn.poll(timeout):
+                raise WorkerError(f"no reply within {timeout:.0f}s")
+            return self.conn.recv()
+        except (EOFError, OSError) as exc:
+            raise WorkerError(f"worker {self.process.pid} exited: {exc!r}") from exc
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ScannerWorkerPool:
+    """Persistent processes running detect-secrets, fed over pipes.
+
+    Each worker is started once, configures the plugins and then serves
+    scan requests until the pool is closed. :meth:`submit` queues a request
+    and returns a ``Future`` at once, so callers can keep downloading while
+    the workers scan. The queue holds at most *max_pending* requests;
+    submitting more blocks until a worker takes one (backpressure).
+
+    Every worker is driven by a dispatcher thread that pings it when idle
+    and restarts it when it exits, does not answer a ping or exceeds the
+    scan timeout. A request interrupted by a crash is retried once on the
+    new worker; if that fails too its snippets get no verdict (None).
+    """
+
+    def __init__(self, settings: dict, allowed_hashes: frozenset, workers: int = 2,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.settings = settings
+        self.allowed_hashes = allowed_hashes
+        self.workers = max(1, workers)
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._dispatch, name=f"detect-secrets-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, snippets) -> Future:
+        """Queue *snippets* for scanning; the future yields one verdict each."""
+        if self._closed:
+            raise RuntimeError("worker pool is closed")
+        future = Future()
+        self._queue.put((future, list(snippets)))
+        return future
+
+    def _start(self) -> _Worker:
+        return _Worker(self._context, self.settings, self.allowed_hashes)
+
+    def _healthy(self, worker: _Worker) -> bool:
+        try:
+            return worker.request(("ping", None), WORKER_PING_TIMEOUT)[0] == "pong"
+        except WorkerError:
+            return False
+
+    def _retire(self, worker: _Worker, reason) -> None:
+        logging.warning("Restarting detect-secrets worker %s: %s", worker.process.pid, reason)
+        self.restarts += 1
+        worker.stop()
+
+    def _dispatch(self) -> None:
+        worker = None
+        while True:
+            try:
+                job = self._queue.get(timeout=WORKER_PING_INTERVAL)
+            except queue.Empty:
+                if worker is not None and not self._healthy(worker):
+                    self._retire(worker, "failed health check")
+                    worker = None
+                continue
+            if job is None:
+                break
+            future, snippets = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            verdicts = [None] * len(snippets)
+            for _ in range(2):
+                try:
+                    if worker is None:
+                        worker = self._start()
+                    status, payload = worker.request(("scan", snippets), WORKER_SCAN_TIMEOUT)
+                except (WorkerError, OSError) as exc:
+                    if worker is not None:
+                        self._retire(worker, exc)
+                    worker = None
+                    continue
+                if status == "ok":
+                    verdicts = payload
+                else:
+                    logging.debug("detect-secrets scanning failed: %s", payload)
+                break
+            future.set_result(verdicts)
+        if worker is not None:
+            worker.stop()
+
+    def close(self) -> None:
+        """Finish queued requests and stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class DetectSecretsScanner:
+    """Run detect-secrets' plugins over batches of snippets.
+
+    Spawning the ``detect-secrets`` CLI per snippet costs far more than the
+    scan itself. This scanner loads the plugins once and checks every line
+    of the snippets as if they were files; secrets whose hash is listed in the
+    baseline are ignored. With *processes* above 0 the scans run in a
+    :class:`ScannerWorkerPool` of that size, and large batches are split
+    across its workers; otherwise they run in this process. When
+    detect-secrets cannot be imported the CLI is used for each snippet.
+
+    Verdicts are stored in *cache* under a fingerprint of the detect-secrets
+    version, plugin settings and baseline. The baseline is reloaded, and
+    the fingerprint changes, when the file is modified.
 
     Parameters
     ----------
-    snippet : str
-        Text snippet to scan.
+    baseline_file : str, optional
+        ``detect-secrets`` baseline providing the plugin settings and the
+        allowlisted secrets.
+    processes : int, optional
+        Persistent worker processes; 0 scans in this process.
+    cache : Verdict_Cache.VerdictCache, optional
+        Persistent cache of verdicts.
+    """
+
+    def __init__(self, baseline_file: Optional[str] = None, processes: int = 0, cache=None):
+        self.baseline_file = baseline_file
+        self.processes = processes
+        self.cache = cache
+        self.available = _supported_detect_secrets()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        if not self.available:
+            logging.debug("detect-secrets package not available or unsupported, using the CLI")
+        self._load()
+
+    def _baseline_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.baseline_file) if self.baseline_file else None
+        except OSError:
+            return None
+
+    def _load(self) -> None:
+        """Read the baseline and derive the settings and cache fingerprint."""
+        self.baseline_mtime = self._baseline_mtime()
+        if self.available:
+            self.settings, self.allowed_hashes = _load_baseline(self.baseline_file)
+            self.fingerprint = fingerprint(
+                "detect-secrets", DETECT_SECRETS_VERSION, self.settings, sorted(self.allowed_hashes)
+            )
+        else:
+            self.settings, self.allowed_hashes = {}, frozenset()
+            self.fingerprint = fingerprint("detect-secrets-cli", file_digest(self.baseline_file))
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            # Workers were configured with the old settings
+            pool.close()
+
+    def _worker_pool(self) -> ScannerWorkerPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ScannerWorkerPool(self.settings, self.allowed_hashes, self.processes)
+            return self._pool
+
+    def submit(self, snippets) -> Future:
+        """Start scanning *snippets* and return a future of their verdicts.
+
+        The verdicts tell, in order, whether each snippet contains a secret.
+        Snippets that cannot be scanned are reported as containing one, so
+        a scanner failure never hides a hit; such verdicts are not cached.
+        Without a worker pool the scan has finished when this returns.
+        """
+        snippets = list(snippets)
+        if not snippets:
+            return _completed([])
+        if self._baseline_mtime() != self.baseline_mtime:
+            logging.info("detect-secrets baseline %s changed, reloading", self.baseline_file)
+            self._load()
+        return _cached_submit(snippets, self._submit_uncached, self.cache, self.fingerprint)
+
+    def scan(self, snippets) -> list[bool]:
+        """Return, in order, whether each snippet contains a secret."""
+        return self.submit(snippets).result()
+
+    def _submit_uncached(self, snippets) -> Future:
+        """Scan *snippets*; the verdict is None for those whose scan failed."""
+        if not self.available:
+            return _completed([_cli_has_secret(s, self.baseline_file) for s in snippets])
+        if self.processes > 0:
+            pool = self._worker_pool()
+            size = len(snippets)
+            if size >= MIN_SPLIT_BATCH:
+                size = -(-size // pool.workers)
+            return _gather(pool.submit(snippets[i:i + size]) for i in range(0, len(snippets), size))
+        try:
+            return _completed(_scan_snippets(snippets, self.settings, self.allowed_hashes))
+        except Exception as exc:
+            logging.debug("detect-secrets scanning failed: %s", exc)
+            return _completed([None] * len(snippets))
+
+    def has_secret(self, snippet: str) -> bool:
+        """Return True if detect-secrets finds a secret in *snippet*."""
+        return self.scan([snippet])[0]
+
+    def close(self) -> None:
+        """Stop the worker pool, if one was started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_detect_secrets_scanner(baseline_file: Optional[str] = None, processes: int = 0,
+                               cache=None) -> DetectSecretsScanner:
+    """Return the scanner shared by every search with these settings."""
+    scanner = DetectSecretsScanner(baseline_file, processes, cache)
+    atexit.register(scanner.close)
+    return scanner
+
+
+def _snippet_index(path: str) -> Optional[int]:
+    """Return the snippet number encoded in a spooled file name."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return int(stem) if stem.isdigit() else None
+
+
+def gitleaks_fingerprint(config_file: Optional[str] = None,
+                         executable: str = DEFAULT_GITLEAKS_EXECUTABLE) -> str:
+    """Return the verdict cache fingerprint of a gitleaks binary and configuration."""
+    binary = shutil.which(executable) or executable
+    try:
+        st = os.stat(binary)
+        binary_id = [os.path.realpath(binary), st.st_size, st.st_mtime]
+    except OSError:
+        binary_id = [binary]
+    return fingerprint("gitleaks", binary_id, file_digest(config_file))
+
+
+def gitleaks_scan_batch(snippets, config_file: Optional[str] = None,
+                        executable: str = DEFAULT_GITLEAKS_EXECUTABLE, cache=None) -> list[bool]:
+    """Return, in order, whether gitleaks detects a secret in each snippet.
+
+    The snippets are written to one temporary directory, one numbered file
+    each, and ``gitleaks detect`` runs once over the directory. Findings
+    are mapped back to the snippets through the ``File`` field of the JSON
+    report. If gitleaks cannot be run every snippet is reported as
+    containing a secret, so a scanner failure never hides a hit.
+
+    Parameters
+    ----------
+    snippets : iterable of str
+        Text snippets to scan.
     config_file : str, optional
         Path to a gitleaks TOML configuration to allowlist secrets.
+    executable : str, optional
+        gitleaks binary to run.
+    cache : Verdict_Cache.VerdictCache, optional
+        Persistent cache of verdicts; only snippets without one are scanned
+        and failed runs are not cached.
     """
-    try:
-        with tempfile.NamedTemporaryFile("w", delete=False) as tmp:
-            tmp.write(snippet)
-            tmp_path = tmp.name
+    snippets = list(snippets)
+    if not snippets:
+        return []
+    def scan(pending):
+        found = _run_gitleaks(pending, config_file, executable)
+        return _completed(found if found is not None else [None] * len(pending))
 
-        cmd = [
-            "gitleaks",
-            "detect",
-            "--no-git",
-            "--source",
-            tmp_path,
-            "--report-format",
-            "json",
-        ]
-        if config_file:
-            cmd.extend(["--config", config_file])
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            logging.debug("gitleaks exited with code %s", result.returncode)
-            return True
-        data = json.loads(result.stdout or "{}")
-        leaks = data.get("leaks") or data.get("Leaks") or data.get("vulnerabilities")
-        return bool(leaks)
+    scanner = gitleaks_fingerprint(config_file, executable) if cache is not None else None
+    return _cached_submit(snippets, scan, cache, scanner).result()
+
+
+def _run_gitleaks(snippets, config_file, executable) -> Optional[list[bool]]:
+    """Run gitleaks once over *snippets*; None if it could not be run."""
+    try:
+        with tempfile.TemporaryDirectory(prefix="gitleaks-") as tmp_dir:
+            source = os.path.join(tmp_dir, "snippets")
+            os.mkdir(source)
+            for index, snippet in enumerate(snippets):
+                with open(os.path.join(source, f"{index}.txt"), "w", encoding="utf-8") as f:
+                    f.write(snippet)
+            report_path = os.path.join(tmp_dir, "report.json")
+            cmd = [
+                executable,
+                "detect",
+                "--no-git",
+                "--source",
+                source,
+                "--report-format",
+                "json",
+                "--report-path",
+                report_path,
+                "--exit-code",
+                "0",
+            ]
+            if config_file:
+                cmd.extend(["--config", config_file])
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                logging.debug("gitleaks exited with code %s", result.returncode)
+                return None
+            with open(report_path, "r", encoding="utf-8") as f:
+                findings = json.load(f) or []
     except FileNotFoundError:
-        logging.debug("gitleaks command not available")
-        return True
+        logging.debug("gitleaks command or report not available")
+        return None
     except Exception as exc:
         logging.debug("gitleaks scanning failed: %s", exc)
-        return True
-    finally:
-        if "tmp_path" in locals() and os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except OSError:
-                pass
+        return None
+
+    flags = [False] * len(snippets)
+    for finding in findings:
+        index = _snippet_index(str(finding.get("File", "")))
+        if index is not None and index < len(flags):
+            flags[index] = True
+    return flags
+
+
+def gitleaks_has_secret(snippet: str, config_file: Optional[str] = None,
+                        executable: str = DEFAULT_GITLEAKS_EXECUTABLE) -> bool:
+    """Return True if gitleaks detects a secret in the snippet.
+
+    The function invokes the ``gitleaks`` CLI so the optional dependency
+    is only required when this check is enabled. Use
+    :func:`gitleaks_scan_batch` to scan many snippets with one process.
+
+    Parameters
+    ----------
+    snippet : str
+        Text snippet to scan.
+    config_file : str, optional
+        Path to a gitleaks TOML configuration to allowlist secrets.
+    executable : str, optional
+        gitleaks binary to run.
+    """
+    return gitleaks_scan_batch([snippet], config_file, executable)[0]
@@ -3,6 +3,8 @@
 import json
 import logging
 import os
+import threading
+import time
 from cryptography.fernet import Fernet, InvalidToken
 
 TOKEN_FILE = "tokens.json"
@@ -99,3 +101,78 @@ def switch_token(_config=None) -> bool:
         return True
     return False
 
+
+
+class TokenPool:
+    """Schedule API requests across several tokens by remaining quota.
+
+    Quota is tracked per token and per rate limit resource (``core``,
+    ``code_search``, ``graphql``...) from the ``X-RateLimit-*`` response headers.
+    A token whose quota is unknown or whose reset time has passed is
+    assumed to have full headroom.
+    """
+
+    def __init__(self, tokens=None):
+        self.tokens: list[str] = []
+        # (token, resource) -> [remaining, reset epoch seconds]
+        self._quota: dict[tuple[str, str], list[int]] = {}
+        self._lock = threading.Lock()
+        for token in tokens or []:
+            self.add(token)
+
+    def add(self, token: str) -> None:
+        """Add *token* to the pool if it is not already present."""
+        with self._lock:
+            if token and token not in self.tokens:
+                self.tokens.append(token)
+
+    def update(self, token: str, resource: str, remaining: int, reset: int | None) -> None:
+        """Record the quota reported for *token* on *resource*."""
+        with self._lock:
+            self._quota[(token, resource)] = [int(remaining), int(reset or 0)]
+
+    def update_from_headers(self, token: str, headers) -> None:
+        """Record quota from the ``X-RateLimit-*`` headers of a response."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        if not token or remaining is None:
+            return
+        resource = headers.get("X-RateLimit-Resource", "core")
+        try:
+            self.update(token, resource, int(remaining), int(headers.get("X-RateLimit-Reset") or 0))
+        except ValueError:
+            logging.debug("Ignoring malformed rate limit headers")
+
+    def update_from_rate_limit(self, token: str, data: dict) -> None:
+        """Record every resource listed in a ``/rate_limit`` response body."""
+        for resource, info in (data or {}).get("resources", {}).items():
+            if "remaining" in info:
+                self.update(token, resource, info["remaining"], info.get("reset"))
+
+    def quota(self, token: str, resource: str = "core") -> tuple[int, int] | None:
+        """Return ``(remaining, reset)`` last seen for *token*.
+
+        None is returned when the quota is unknown or its window has reset.
+        """
+        with self._lock:
+            quota = self._quota.get((token, resource))
+            if quota is None or quota[1] <= time.time():
+                return None
+            return quota[0], quota[1]
+
+    def _headroom(self, token: str, resource: str, now: float) -> float:
+        quota = self._quota.get((token, resource))
+        if quota is None or quota[1] <= now:
+            return float("inf")
+        return quota[0]
+
+    def acquire(self, resource: str = "core") -> str | None:
+        """Return the token with the most headroom for *resource*.
+
+        Quota is only updated from response headers, so a request is
+        never counted twice.
+        """
+        now = time.time()
+        with self._lock:
+            if not self.tokens:
+                return None
+            return max(self.tokens, key=lambda t: self._headroom(t, resource, now))
@@ -0,0 +1,139 @@
+"""Persistent cache of external scanner verdicts keyed by snippet hash."""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_FILE = os.path.join(".gitsleuth_cache", "verdicts.sqlite3")
+DEFAULT_TTL_DAYS = 30
+# Keys per SELECT, below SQLite's bound parameter limit
+LOOKUP_CHUNK = 500
+
+
+def fingerprint(*parts) -> str:
+    """Return a digest identifying a scanner and everything its verdicts depend on."""
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def file_digest(path) -> str:
+    """Return the SHA-256 of a file's contents, or "" if it cannot be read."""
+    if not path:
+        return ""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+class VerdictCache:
+    """Remember whether a scanner found a secret in a snippet.
+
+    Keys are the SHA-256 of the scanner fingerprint and the snippet text,
+    so a new scanner version, configuration or baseline changes every key
+    and old verdicts are simply never looked up again. Entries older than
+    *ttl* seconds are ignored and removed when the cache is opened. Only
+    verdicts from scans that completed should be stored; errors are not.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, ttl: float = DEFAULT_TTL_DAYS * 86400):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, verdict INTEGER NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM verdicts WHERE created < ?", (time.time() - ttl,))
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as exc:
+            logging.warning(f"Verdict cache {path} unavailable: {exc}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(scanner: str, snippet: str) -> str:
+        """Return the cache key of *snippet* for the scanner fingerprint *scanner*."""
+        digest = hashlib.sha256(scanner.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(snippet.encode("utf-8", errors="surrogatepass"))
+        return digest.hexdigest()
+
+    def get_many(self, scanner: str, snippets) -> list:
+        """Return the cached verdict of each snippet, or None where there is none."""
+        keys = [self.make_key(scanner, s) for s in snippets]
+        found = {}
+        if self._conn is not None and keys:
+            cutoff = time.time() - self.ttl
+            with self._lock:
+                try:
+                    for i in range(0, len(keys), LOOKUP_CHUNK):
+                        chunk = keys[i:i + LOOKUP_CHUNK]
+                        rows = self._conn.execute(
+                            "SELECT key, verdict FROM verdicts WHERE created >= ? AND key IN "
+                            f"({','.join('?' * len(chunk))})",
+                            (cutoff, *chunk),
+                        )
+                        found.update((key, bool(verdict)) for key, verdict in rows)
+                except sqlite3.Error as exc:
+                    logging.debug(f"Verdict cache lookup failed: {exc}")
+        verdicts = [found.get(key) for key in keys]
+        with self._lock:
+            hits = sum(v is not None for v in verdicts)
+            self.hits += hits
+            self.misses += len(verdicts) - hits
+        return verdicts
+
+    def put_many(self, scanner: str, snippets, verdicts) -> None:
+        """Store the verdicts of completed scans; None verdicts are skipped."""
+        if self._conn is None:
+            return
+        now = time.time()
+        rows = [
+            (self.make_key(scanner, s), int(v), now)
+            for s, v in zip(snippets, verdicts)
+            if v is not None
+        ]
+        if not rows:
+            return
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO verdicts (key, verdict, created) VALUES (?, ?, ?)", rows
+                )
+                self._conn.commit()
+            except sqlite3.Error as exc:
+                logging.debug(f"Failed to cache scanner verdicts: {exc}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters of this session."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@functools.lru_cache(maxsize=None)
+def get_verdict_cache(path: str = DEFAULT_CACHE_FILE, ttl: float = DEFAULT_TTL_DAYS * 86400) -> VerdictCache:
+    """Return the cache shared by every scanner using *path*."""
+    return VerdictCache(path, ttl)